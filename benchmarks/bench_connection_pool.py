@@ -0,0 +1,53 @@
+"""
+Compare a fresh MV connection per call (the old connect_to_mv_com_server path)
+with the pooled connection manager, using the pure-Python fake server.
+
+Run from the project root:
+    python -m benchmarks.bench_connection_pool
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from mv_connection_pool import MVConnectionPool
+from mv_fake import fake_connection_factory
+
+CONNECT_LATENCY = 0.05   # seconds per handshake
+CALLS = 100
+START, END = datetime(2024, 1, 1), datetime(2024, 3, 1)
+
+
+def fetch(con, i):
+    return len(con.GetDailyRange(symbol=f"/GCL{i % 22}", From=START, to=END))
+
+
+def bench_unpooled(factory):
+    t0 = time.perf_counter()
+    for i in range(CALLS):
+        fetch(factory(), i)
+    return time.perf_counter() - t0
+
+
+def bench_pooled(factory, thread_affinity, workers=1):
+    pool = MVConnectionPool(factory, thread_affinity=thread_affinity, max_size=workers)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda i: pool.run(lambda con: fetch(con, i)), range(CALLS)))
+    elapsed = time.perf_counter() - t0
+    pool.close()
+    return elapsed, pool.stats
+
+
+def main():
+    factory = fake_connection_factory(connect_latency=CONNECT_LATENCY)
+    print(f"{CALLS} calls, {CONNECT_LATENCY * 1000:.0f} ms handshake")
+    print(f"  unpooled:                 {bench_unpooled(factory):7.3f}s")
+    for affinity in (True, False):
+        for workers in (1, 4):
+            elapsed, stats = bench_pooled(factory, affinity, workers)
+            mode = "per-thread" if affinity else "shared"
+            print(f"  pooled {mode:<10} x{workers}:  {elapsed:7.3f}s  {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Micro-benchmark of daily_data_to_dataframe (columnar decode) against the previous
+record-by-record path, on synthetic bar objects.
+
+Run from the project root:
+    python -m benchmarks.bench_decode
+"""
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from gcc_sparta_lib import daily_data_to_dataframe, _daily_data_to_dataframe_rowwise
+from mv_fake import make_fake_bars
+
+
+def timeit(func, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    for years in (1, 5, 15):
+        bars = make_fake_bars("/GCLZ25", datetime(2025 - years, 1, 1), datetime(2024, 12, 31))
+        old = _daily_data_to_dataframe_rowwise(bars)
+        new = daily_data_to_dataframe(bars)
+        pd.testing.assert_frame_equal(old, new, check_dtype=False)
+
+        t_old = timeit(_daily_data_to_dataframe_rowwise, bars, repeat=3)
+        t_new = timeit(daily_data_to_dataframe, bars)
+        print(f"{len(bars):>6} bars  row-wise {t_old * 1000:8.1f} ms  columnar {t_new * 1000:7.2f} ms  x{t_old / t_new:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
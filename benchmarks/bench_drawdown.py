@@ -0,0 +1,53 @@
+"""
+Accuracy check and benchmark of drawdown.rolling_max_drawdown against drawing down every window.
+
+Run from the project root:
+    python -m benchmarks.bench_drawdown
+Exits with status 1 if any case differs from the brute-force result.
+"""
+import sys
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from drawdown import rolling_max_drawdown, wealth_curves
+
+
+def timeit(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def brute_force(wealth, window):
+    """Running peak and drawdown of every window from scratch, O(n * window)."""
+    windows = sliding_window_view(wealth, window, axis=0)  # (n - window + 1, k, window)
+    result = np.full(wealth.shape, np.nan)
+    result[window - 1:] = (windows / np.maximum.accumulate(windows, axis=-1) - 1).min(axis=-1)
+    return result
+
+
+def main():
+    rng = np.random.default_rng(42)
+    wealth = wealth_curves(rng.standard_t(3, (15 * 252, 10)) * 0.01)  # 15 years, 10 series
+    wealth[500:560] = wealth[499]  # a flat stretch
+    ok = True
+    print(f"{'window':>7}{'brute':>11}{'blocked':>11}{'speedup':>10}{'max err':>11}")
+    for window in (21, 63, 252, 1000):
+        result = rolling_max_drawdown(wealth, window)
+        expected = brute_force(wealth, window)
+        err = np.nanmax(np.abs(result - expected))
+        ok &= err < 1e-12 and np.array_equal(np.isnan(result), np.isnan(expected))
+        t_brute = timeit(lambda: brute_force(wealth, window), 1)
+        t_blocked = timeit(lambda: rolling_max_drawdown(wealth, window))
+        print(f"{window:>7}{t_brute * 1000:>9.1f}ms{t_blocked * 1000:>9.1f}ms"
+              f"{t_brute / t_blocked:>9.0f}x{err:>11.1e}{'' if err < 1e-12 else '  FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
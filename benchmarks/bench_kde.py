@@ -0,0 +1,80 @@
+"""
+Accuracy check and benchmark of kde.BinnedKDE against scipy.stats.gaussian_kde.
+
+Run from the project root:
+    python -m benchmarks.bench_kde
+Exits with status 1 if any case is outside the accuracy tolerance.
+"""
+import sys
+import time
+
+import numpy as np
+from scipy.stats import gaussian_kde
+
+from kde import BinnedKDE
+
+# Max absolute error relative to the peak density
+TOLERANCE = 1e-3
+
+
+def timeit(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def samples(rng):
+    """Shapes the app sees: random-walk prices, fat-tailed returns, a bimodal spread."""
+    yield "random walk", 80 + rng.normal(0, 1.5, 4000).cumsum()
+    yield "student-t returns", rng.standard_t(3, 20000) * 0.01
+    yield "bimodal spread", np.concatenate([rng.normal(-5, 1, 30000), rng.normal(4, 0.5, 10000)])
+    yield "15y x 40 contracts", 60 + rng.normal(0, 1, (40, 3780)).cumsum(axis=1).ravel()
+
+
+def check_accuracy(rng):
+    ok = True
+    print(f"{'case':<22}{'bw':<11}{'n':>9}{'max rel err':>14}")
+    for name, values in samples(rng):
+        x = np.linspace(values.min(), values.max(), 500)
+        idx = rng.choice(len(values), min(len(values), 20000), replace=False)
+        data = values[idx]
+        for bw_method in ("scott", "silverman", 0.1):
+            expected = gaussian_kde(data, bw_method=bw_method)(x)
+            actual = BinnedKDE(data, bw_method=bw_method)(x)
+            err = np.max(np.abs(actual - expected)) / expected.max()
+            ok &= err <= TOLERANCE
+            print(f"{name:<22}{str(bw_method):<11}{len(data):>9}{err:>14.2e}{'' if err <= TOLERANCE else '  FAIL'}")
+
+    weights = rng.uniform(0.5, 2, 5000)
+    data = rng.normal(size=5000)
+    x = np.linspace(-4, 4, 300)
+    err = np.max(np.abs(BinnedKDE(data, weights=weights)(x) - gaussian_kde(data, weights=weights)(x)))
+    ok &= err <= TOLERANCE
+    print(f"{'weighted normal':<22}{'scott':<11}{5000:>9}{err:>14.2e}")
+    return ok
+
+
+def benchmark(rng):
+    print(f"\n{'n':>9}{'points':>8}{'scipy':>11}{'binned':>11}{'speedup':>10}")
+    for n in (1_000, 10_000, 100_000, 500_000):
+        values = rng.normal(size=n).cumsum()
+        for points in (500, 1000):
+            x = np.linspace(values.min(), values.max(), points)
+            repeat = 1 if n * points > 5e7 else 3
+            t_scipy = timeit(lambda: gaussian_kde(values)(x), repeat)
+            t_binned = timeit(lambda: BinnedKDE(values)(x), repeat)
+            print(f"{n:>9}{points:>8}{t_scipy * 1000:>9.1f}ms{t_binned * 1000:>9.1f}ms{t_scipy / t_binned:>9.0f}x")
+
+
+def main():
+    rng = np.random.default_rng(42)
+    ok = check_accuracy(rng)
+    benchmark(rng)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
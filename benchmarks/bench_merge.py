@@ -0,0 +1,146 @@
+"""
+Equivalence check and benchmark of data_engineering.align_legs against the previous
+concat-per-leg merge in process_commodities_data, plus a check that the merged frames
+process_commodities_data caches are not shared with callers.
+
+Run from the project root:
+    python -m benchmarks.bench_merge
+Exits with status 1 if the frames differ.
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_engineering
+from data_engineering import align_legs, with_derived_columns
+
+YEARS = 10
+LEG_COUNTS = (2, 10, 50)
+
+
+def timeit(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def make_legs(rng, n_legs):
+    """Business-day price legs with ~2% of days missing per leg, split evenly between the groups."""
+    days = pd.bdate_range(end="2025-06-30", periods=YEARS * 260)
+    legs = []
+    for j in range(n_legs):
+        present = rng.random(len(days)) > 0.02
+        legs.append((f"Leg {j}", days[present].to_numpy(), 60 + rng.normal(0, 1, present.sum()).cumsum()))
+    return legs[:n_legs // 2], legs[n_legs // 2:]
+
+
+def concat_merge(legs_A, legs_B):
+    """The previous process_commodities_data merge, minus fetching."""
+    def load_group_data(legs):
+        group_df = pd.DataFrame()
+        for label, dates, values in legs:
+            data = pd.DataFrame({"Date": dates, label: values}).set_index("Date")
+            group_df = data[[label]] if group_df.empty else pd.concat([group_df, data[[label]]], axis=1)
+        group_df["Group_Mean"] = group_df.mean(axis=1)
+        return group_df
+
+    df_A, df_B = load_group_data(legs_A), load_group_data(legs_B)
+    merged = pd.DataFrame(index=df_A.index.union(df_B.index)).sort_index()
+    for label, _, _ in legs_A:
+        merged[label] = df_A[label]
+    for label, _, _ in legs_B:
+        merged[label] = df_B[label]
+    merged["Group A"] = df_A["Group_Mean"]
+    merged["Group B"] = df_B["Group_Mean"]
+    merged.dropna(inplace=True)
+    merged["Spread"] = merged["Group A"] + merged["Group B"]
+    merged["Date"] = merged.index
+    merged["Year"] = merged.index.year
+    merged["Month"] = merged.index.month
+    merged["MonthName"] = merged.index.strftime('%b')
+    merged["DayOfWeek"] = merged.index.dayofweek
+    merged["DayName"] = merged.index.strftime('%a')
+    merged["Return_A"] = merged["Group A"].pct_change()
+    merged["Return_B"] = merged["Group B"].pct_change()
+    merged["Return_Spread"] = merged["Spread"].pct_change()
+    return merged
+
+
+def check_cache_isolation(rng):
+    """
+    Mutate the frame process_commodities_data returns, then call it again (served from the
+    cache, and after a tail refresh): both results must equal a fresh alignment.
+    """
+    days = pd.bdate_range(end="2025-06-30", periods=2 * 260)
+    bars = {symbol: pd.DataFrame({"Date": days, "Close": 60 + rng.normal(0, 1, len(days)).cumsum()})
+            for symbol in ("/A1", "/A2", "/B1")}
+
+    def load(symbols, start, end):
+        return {s: bars[s][(bars[s]["Date"] >= start) & (bars[s]["Date"] <= end)].reset_index(drop=True) for s in symbols}
+
+    group_A = [{"symbol": "/A1", "label": "A1", "weight": 1}, {"symbol": "/A2", "label": "A2", "weight": 1}]
+    group_B = [{"symbol": "/B1", "label": "B1", "weight": -1}]
+
+    def expected(end):
+        data = load(["/A1", "/A2", "/B1"], days[0], end)
+        legs_A, _ = data_engineering.group_legs(group_A, {}, data)
+        legs_B, _ = data_engineering.group_legs(group_B, {}, data)
+        return align_legs(legs_A, legs_B)
+
+    def process(end):
+        return data_engineering.process_commodities_data(group_A, group_B, days[0], end, {}, {}, {})[0]
+
+    saved = data_engineering.load_commodities_data, data_engineering.get_mv_data_many
+    data_engineering.load_commodities_data = load
+    data_engineering.get_mv_data_many = lambda symbols, start, end, as_dict=True: (load(symbols, start, end), {})
+    try:
+        ok = True
+        first_end, later_end = days[300], days[-1]
+        for end in (first_end, first_end, later_end):
+            merged = process(end)
+            try:
+                pd.testing.assert_frame_equal(merged, expected(end))
+            except AssertionError as e:
+                ok = False
+                print(f"cached frame for {end:%Y-%m-%d} is not clean: {e}")
+            # Caller writes that must not reach the cache
+            merged.iloc[:, 0] = -1.0
+            merged["Spread"] *= 0
+            merged["Extra"] = 1
+        print(f"cache isolation: {'ok' if ok else 'FAIL'}")
+        return ok
+    finally:
+        data_engineering.load_commodities_data, data_engineering.get_mv_data_many = saved
+        data_engineering._merged_frames.clear()
+
+
+def main():
+    rng = np.random.default_rng(42)
+    ok = True
+    print(f"{'legs':>5}{'rows':>7}{'concat':>11}{'aligned':>11}{'+derived':>11}{'speedup':>10}")
+    for n_legs in LEG_COUNTS:
+        legs_A, legs_B = make_legs(rng, n_legs)
+        expected = concat_merge(legs_A, legs_B)
+        actual = with_derived_columns(align_legs(legs_A, legs_B))
+        try:
+            pd.testing.assert_frame_equal(actual[expected.columns], expected, check_freq=False, check_index_type=False)
+        except AssertionError as e:
+            ok = False
+            print(f"{n_legs} legs: frames differ: {e}")
+
+        t_concat = timeit(lambda: concat_merge(legs_A, legs_B))
+        t_aligned = timeit(lambda: align_legs(legs_A, legs_B))
+        t_derived = timeit(lambda: with_derived_columns(align_legs(legs_A, legs_B)))
+        print(f"{n_legs:>5}{len(expected):>7}{t_concat * 1000:>9.1f}ms{t_aligned * 1000:>9.1f}ms"
+              f"{t_derived * 1000:>9.1f}ms{t_concat / t_aligned:>9.1f}x")
+    ok &= check_cache_isolation(rng)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
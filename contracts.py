@@ -0,0 +1,137 @@
+import sys
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+# Futures month code to month number mapping
+MONTH_CODE_TO_NUM = {
+    'F': 1, 'G': 2, 'H': 3, 'J': 4, 'K': 5, 'M': 6,
+    'N': 7, 'Q': 8, 'U': 9, 'V': 10, 'X': 11, 'Z': 12
+}
+MONTH_NUM_TO_CODE = {num: code for code, num in MONTH_CODE_TO_NUM.items()}
+
+CONTRACT_DTYPE = np.dtype([("root", object), ("month", np.int8), ("year", np.int16)])
+
+
+class Contract:
+    """Parsed futures contract symbol such as '/GCLK25' -> root '/GCL', month 5, year 2025."""
+
+    __slots__ = ("symbol", "root", "month_code", "month", "year")
+
+    def __init__(self, root, month, year):
+        self.root = sys.intern(root)
+        self.month = month
+        self.year = year
+        self.month_code = MONTH_NUM_TO_CODE[month]
+        self.symbol = f"{root}{self.month_code}{year % 100:02d}"
+
+    def __repr__(self):
+        return f"Contract({self.symbol!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, Contract) and self.symbol == other.symbol
+
+    def __hash__(self):
+        return hash(self.symbol)
+
+    def shift_year(self, years):
+        return make_contract(self.root, self.month, self.year + years)
+
+    def next_contract(self):
+        """Same month of the following year."""
+        return self.shift_year(1)
+
+
+@lru_cache(maxsize=65536)
+def make_contract(root, month, year):
+    return Contract(root, month, year)
+
+
+@lru_cache(maxsize=65536)
+def parse_contract(symbol):
+    """
+    Memoized parser: '/GCLK25' -> Contract, or None if the symbol has no
+    month code + two-digit year suffix. Repeated symbols share one interned object.
+    """
+    if not isinstance(symbol, str) or len(symbol) < 5:
+        return None
+    year_suffix, month_code = symbol[-2:], symbol[-3].upper()
+    if not year_suffix.isdigit() or month_code not in MONTH_CODE_TO_NUM:
+        return None
+    return make_contract(symbol[:-3], MONTH_CODE_TO_NUM[month_code], 2000 + int(year_suffix))
+
+
+class ContractArray:
+    """
+    A batch of contracts held as a structured NumPy array (root, month, year), so whole
+    universes are classified with array operations. Symbols that don't parse have month 0.
+    """
+
+    def __init__(self, records):
+        self.records = records
+
+    @classmethod
+    def from_symbols(cls, symbols):
+        symbols = np.asarray(list(symbols), dtype=object)
+        records = np.zeros(len(symbols), dtype=CONTRACT_DTYPE)
+        if len(symbols):
+            # Parse each distinct symbol once and broadcast back
+            unique, inverse = np.unique(symbols.astype(str), return_inverse=True)
+            parsed = [parse_contract(s) for s in unique.tolist()]
+            unique_records = np.array(
+                [(c.root, c.month, c.year) if c else (s, 0, 0) for c, s in zip(parsed, unique.tolist())],
+                dtype=CONTRACT_DTYPE,
+            )
+            records = unique_records[inverse.ravel()]
+        return cls(records)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def roots(self):
+        return self.records["root"]
+
+    @property
+    def months(self):
+        return self.records["month"].astype(int)
+
+    @property
+    def years(self):
+        return self.records["year"].astype(int)
+
+    @property
+    def valid(self):
+        return self.records["month"] > 0
+
+    def is_expired(self, today=None, inclusive=True):
+        """
+        Expired if the contract year/month is before today's (inclusive=True also counts the
+        current month as expired). Invalid symbols are never expired.
+        """
+        today = today or datetime.now()
+        contract_index = self.years * 12 + self.months
+        today_index = today.year * 12 + today.month
+        expired = contract_index <= today_index if inclusive else contract_index < today_index
+        return expired & self.valid
+
+    def month_passed(self, current_month=None):
+        """Month-only rule: the contract month is at or before the current calendar month."""
+        current_month = current_month or datetime.now().month
+        return (self.months <= current_month) & self.valid
+
+    def shift_year(self, years):
+        """Same roots and months, `years` years later (invalid entries stay invalid)."""
+        records = self.records.copy()
+        records["year"] = np.where(self.valid, records["year"] + years, 0)
+        return ContractArray(records)
+
+    def next_contract(self):
+        return self.shift_year(1)
+
+    def symbols(self):
+        """Symbols as an object array; invalid entries keep their original text."""
+        codes = np.array([MONTH_NUM_TO_CODE.get(m, "") for m in range(13)], dtype=object)
+        suffix = np.char.zfill((self.years % 100).astype(str), 2).astype(object)
+        return np.where(self.valid, self.roots + codes[self.months] + suffix, self.roots)
@@ -1,9 +1,17 @@
 from datetime import datetime
-from collections import defaultdict
+from functools import lru_cache
 import pandas as pd
-import pandas_market_calendars as mcal
+from contracts import MONTH_CODE_TO_NUM, parse_contract
 
 def get_available_commodities():
+    """
+    Symbol -> description for the whole catalog. Built once per calendar year and shared
+    between reruns, so callers must treat it as read-only.
+    """
+    return _build_available_commodities(datetime.now().year)
+
+@lru_cache(maxsize=2)
+def _build_available_commodities(current_year):
     # Base roots and descriptions
     AVAILABLE_COMMODITIES = {
         # NYMEX Futures
@@ -99,7 +107,6 @@ def get_available_commodities():
         'N': 'JUL', 'Q': 'AUG', 'U': 'SEP', 'V': 'OCT', 'X': 'NOV', 'Z': 'DEC'
     }
     MONTHS_3L = list(MONTH_CODES.values())
-    current_year = datetime.now().year
     years_to_extend_by = 3
     years = [current_year + i for i in range(years_to_extend_by)]  # Current and next years_to_extend_by years
     year_suffixes = [str(y)[-2:] for y in years]
@@ -206,29 +213,25 @@ def get_available_commodities():
     AVAILABLE_COMMODITIES.update(variations)
     return AVAILABLE_COMMODITIES
 
+# Exchange / group by symbol prefix; the first matching entry wins and
+# symbols matching none are left uncategorized
+CATEGORY_PREFIXES = [
+    ("NYMEX", ('/G',)),
+    # ("CBOT", ('/Z', '/EH', '/K')),
+    # ("CME FX", ('/6', '/E', '/F')),
+    # ("ICE Futures Europe", ('/BRN', '/GAS', '/WBS')),
+    # ("ICE Futures US", ('/1s',)),
+    # ("DME/TOCOM", ('/O', '/S')),
+    # ("EIA Weekly", ('#EI',)),
+    # ("Indices", ('$',)),
+    # ("Other", ('',)),
+]
+
 # Categorize commodities by exchange/root symbol prefix
 def categorize_commodities(commodities):
-    categories = defaultdict(list)
-    for symbol, desc in commodities.items():
-        if symbol.startswith('/G'):  # NYMEX
-            categories["NYMEX"].append((symbol, desc))
-        # elif symbol.startswith(('/Z', '/EH', '/K')):
-        #     categories["CBOT"].append((symbol, desc))
-        # elif symbol.startswith(('/6', '/E', '/F')):
-        #     categories["CME FX"].append((symbol, desc))
-        # elif symbol.startswith(('/BRN', '/GAS', '/WBS')):
-        #     categories["ICE Futures Europe"].append((symbol, desc))
-        # elif symbol.startswith('/1s'):
-        #     categories["ICE Futures US"].append((symbol, desc))
-        # elif symbol.startswith(('/O', '/S')):
-        #     categories["DME/TOCOM"].append((symbol, desc))
-        # elif symbol.startswith('#EI'):
-        #     categories["EIA Weekly"].append((symbol, desc))
-        # elif symbol.startswith('$'):
-        #     categories["Indices"].append((symbol, desc))
-        # else:
-        #     categories["Other"].append((symbol, desc))
-    return categories
+    """{category: [(symbol, desc), ...]} sorted by description, via the symbol universe index."""
+    from symbol_universe import SymbolUniverse
+    return SymbolUniverse(commodities).category_items()
 
 # Month code mapping
 MONTH_CODES_PARSE = {
@@ -242,35 +245,27 @@ MONTH_STR_TO_NUM = {
     'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12
 }
 
+def preset_contract_symbol(ticker, month_code, today=None):
+    """
+    Contract a preset leg resolves to, e.g. ('/GCL', 'V') -> '/GCLV25'.
+    Months at or before the current month roll to next year's contract.
+    """
+    today = today or datetime.now()
+    month_int = MONTH_CODE_TO_NUM.get(month_code.upper())
+    if not month_int:
+        raise ValueError(f"Invalid futures month code: {month_code}")
+    symbol_year = (today.year + 1 if month_int <= today.month else today.year) % 100
+    return f"{ticker}{month_code}{symbol_year}"
+
 def parse_contract_symbol(symbol):
     """
     Extracts month and year from a futures symbol like '/GCLK25'.
     Returns (month, year) as integers, or (None, None) if parsing fails.
     """
-    try:
-        if not symbol or len(symbol) < 5:
-            return None, None
-
-        year_suffix = symbol[-2:]       # e.g., '25'
-        month_code = symbol[-3:-2]      # e.g., 'K' from '/GCLK25'
-
-        MONTH_CODES_PARSE = {
-            'F': 1, 'G': 2, 'H': 3, 'J': 4, 'K': 5, 'M': 6,
-            'N': 7, 'Q': 8, 'U': 9, 'V': 10, 'X': 11, 'Z': 12
-        }
-
-        if not year_suffix.isdigit():
-            return None, None
-
-        month = MONTH_CODES_PARSE.get(month_code.upper())
-        if not month:
-            return None, None
-
-        year = int("20" + year_suffix)  # Converts '25' -> 2025
-
-        return month, year
-    except Exception:
+    contract = parse_contract(symbol)
+    if contract is None:
         return None, None
+    return contract.month, contract.year
 
 def get_month_number(month):
     """Handle both string and integer month formats."""
@@ -289,6 +284,11 @@ def check_expiry(df, contract_month, contract_year, symbol):
     Adds an 'expired' column to the DataFrame based on contract month/year.
     Returns 1 if expired, else 0.
     """
+    # A parseable symbol is authoritative for the contract month and year
+    contract = parse_contract(symbol)
+    if contract is not None:
+        contract_month, contract_year = contract.month, contract.year
+
     try:
         contract_month_num = get_month_number(contract_month)
         contract_year = int(contract_year)
@@ -324,8 +324,11 @@ def get_next_commodity_symbol(commodity_symbol):
     Returns:
         str: The next contract symbol, or None if not expired.
     """
-        
-    # Extract the letters and numbers from the symbol
+    contract = parse_contract(commodity_symbol)
+    if contract is not None:
+        return contract.next_contract().symbol
+
+    # Fallback for symbols without a month code + year suffix: extract the letters and numbers from the symbol
     letters = ''.join([c for c in commodity_symbol if not c.isdigit()])
     numbers = ''.join([c for c in commodity_symbol if c.isdigit()])
     
@@ -367,36 +370,9 @@ def append_new_after_old(old_df, new_df):
     return combined_df
 
 def get_expiry_date(symbol):
-    month, year = parse_contract_symbol(symbol)
-    if month is None or year is None:
-        return None  # or a default datetime or np.nan
-    # Find the month before the contract month
-    if month == 1:
-        expiry_month = 12
-        expiry_year = year - 1
-    else:
-        expiry_month = month - 1
-        expiry_year = year
-
-    # Get US calendar
-    nymex = mcal.get_calendar('Financial_Markets_US')
-    # 25th of expiry month
-    twenty_fifth = datetime(expiry_year, expiry_month, 25)
-    # Find valid business days in that month
-    sched = nymex.schedule(start_date=f'{expiry_year}-{expiry_month:02d}-01',
-                           end_date=f'{expiry_year}-{expiry_month:02d}-28')
-    business_days = sched.index
-
-    # Find the last business day <= 25th
-    last_bday = max([d for d in business_days if d <= twenty_fifth])
-    # Go back three business days
-    idx = business_days.get_loc(last_bday)
-    expiry_idx = idx - 3
-    expiry_date = business_days[expiry_idx].date()
-    return expiry_date
-
-
-
-
-
- 
+    """
+    Expiry date of a contract (three business days before the last business day on or
+    before the 25th of the prior month), served from the precomputed expiry index.
+    """
+    from expiry_calendar import get_expiry_index
+    return get_expiry_index().expiry_date(symbol)
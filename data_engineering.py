@@ -1,123 +1,195 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
 import streamlit as st
-from create_marketview_options import (
-    get_expiry_date, get_next_commodity_symbol, append_new_after_old,
-    check_expiry
-)
-from gcc_sparta_lib import get_mv_data
+from gcc_sparta_lib import get_mv_data_many
+
+def show_load_error(symbol, error_type, details):
+    st.error(
+        f"⚠️ Data loading failed for `{symbol}`.\n\n"
+        f"**Error Type:** {error_type}\n"
+        f"**Details:** {details}\n\n"
+        "This is a common error when the data provider is overloaded or called too frequently. "
+        "Please try again in a few minutes."
+    )
 
 @st.cache_data
-def load_commodity_data(symbol, start_date, end_date):
+def load_commodities_data(symbols, start_date, end_date):
     """
-    Load commodity data for a given symbol and date range.
-    Gracefully handles connection or data issues.
+    Load several symbols in one get_mv_data_many batch.
+    Returns a dict symbol -> DataFrame; failed symbols map to an empty DataFrame and are reported.
     """
-    try:
-        df = get_mv_data(symbol=symbol, start_date=start_date, end_date=end_date)
-        if df.empty:
-            st.warning(f"No data returned for {symbol}. The data source may be temporarily unavailable.")
-        return df
-    except Exception as e:
-        error_type = type(e).__name__
-        st.error(
-            f"⚠️ Data loading failed for `{symbol}`.\n\n"
-            f"**Error Type:** {error_type}\n"
-            f"**Details:** {e}\n\n"
-            "This is a common error when the data provider is overloaded or called too frequently. "
-            "Please try again in a few minutes."
-        )
-        return pd.DataFrame()
+    frames, errors = get_mv_data_many(symbols, start_date, end_date, as_dict=True)
+    for symbol, error in errors.items():
+        error_type, _, details = error.partition(": ")
+        show_load_error(symbol, error_type, details)
+    return {symbol: frames.get(symbol, pd.DataFrame()) for symbol in symbols}
+
+# Columns derived from the merged frame, added on request by with_derived_columns
+DERIVED_COLUMNS = {
+    "Year": lambda merged: merged.index.year,
+    "Month": lambda merged: merged.index.month,
+    "MonthName": lambda merged: merged.index.strftime('%b'),
+    "DayOfWeek": lambda merged: merged.index.dayofweek,
+    "DayName": lambda merged: merged.index.strftime('%a'),
+    "Return_A": lambda merged: merged["Group A"].pct_change(),
+    "Return_B": lambda merged: merged["Group B"].pct_change(),
+    "Return_Spread": lambda merged: merged["Spread"].pct_change(),
+}
+RETURN_COLUMNS = ["Return_A", "Return_B", "Return_Spread"]
+
+def with_derived_columns(merged, columns=None):
+    """merged plus the requested DERIVED_COLUMNS (all when None) it does not have yet; merged itself is not modified."""
+    missing = [column for column in (columns or DERIVED_COLUMNS) if column not in merged.columns]
+    if merged.empty or not missing:
+        return merged
+    return merged.assign(**{column: DERIVED_COLUMNS[column] for column in missing})
+
+def align_legs(legs_A, legs_B):
+    """
+    Merge price legs into the wide frame in one step. legs_A / legs_B are lists of
+    (label, dates, values) with values already weighted and converted.
 
-def process_commodities_data(group_A, group_B, start_date, end_date, available_commodities, group_A_conversion, group_B_conversion):
-    def load_group_data(group, group_conversion):
-        group_df = pd.DataFrame()
-        meta_info = []
-
-        for asset in group:
-            symbol = asset["symbol"]
-            label = asset["label"]
-            weight = asset["weight"]
-            conversion = group_conversion.get(symbol, 1)  # Default to 1 if no conversion is provided
-            name = available_commodities.get(symbol, symbol)
-            
-            data = load_commodity_data(symbol, start_date, end_date)
-
-            if data.empty:
-                continue
-
-            # Expiry logic
-            contract_month, contract_year = symbol[-3:], "20" + symbol[-5:-3]
-            data = check_expiry(data, contract_month, contract_year, symbol)
-            # Appending logic - not going to do append because only needed during seaso
-            # if not data.empty and 'expired' in data.columns and data.expired.unique() == 1:
-            #     next_symbol = get_next_commodity_symbol(symbol)
-            #     next_data = load_commodity_data(next_symbol, start_date, end_date)
-            #     if not next_data.empty:
-            #         next_data["Symbol"] = next_symbol
-            #         data = append_new_after_old(data, next_data)
-            #         data["expired"] = data["expired"].fillna(0)
-            #         st.info(f"Appended expired data for {label} with {next_symbol}")
-
-            if not data.empty:
-                data = data[["Date", "Close"]].copy()
-                data.set_index("Date", inplace=True)
-                data.rename(columns={"Close": label}, inplace=True)
-                data[label] = data[label] * weight * conversion  # Apply conversion here
-                meta_info.append((symbol, label,contract_month))
-
-                if group_df.empty:
-                    group_df = data[[label]]
-                else:
-                    group_df = pd.concat([group_df, data[[label]]], axis=1)
-
-        if not group_df.empty:
-            group_df["Group_Mean"] = group_df.mean(axis=1)  # Group total is the mean of individual assets
-
-        return group_df, meta_info
-
-    # Load data for both groups
-    df_A, meta_A = load_group_data(group_A, group_A_conversion)
-    df_B, meta_B = load_group_data(group_B, group_B_conversion)
-
-    if df_A.empty or df_B.empty:
-        st.error("Failed to load data for one or both groups.")
-        return pd.DataFrame(), "Group A", "Group B"
-
-    merged = pd.DataFrame(index=df_A.index.union(df_B.index)).sort_index()
-
-    # Add all individual assets to the merged dataframe
-    for asset_symbol, asset_label,contract_month in meta_A:
-        merged[asset_label] = df_A[asset_label]
-    
-    for asset_symbol, asset_label,contract_month in meta_B:
-        merged[asset_label] = df_B[asset_label]
-    
-    # Add group totals
-    merged["Group A"] = df_A["Group_Mean"]
-    merged["Group B"] = df_B["Group_Mean"]
-    
-    # Clean up missing values
-    merged.dropna(inplace=True)
-    
-    # Calculate spread metrics
-    #merged["Spread"] = merged["Group B"] - merged["Group A"]
-    merged["Spread"] = merged["Group A"] + merged["Group B"]
-    #merged["Spread_Ratio"] = merged["Group B"] / merged["Group A"]
-
-    # Add date as column (keeping the date index)
+    Every leg is scattered into one (union dates x legs) array, rows where any leg is
+    missing are dropped, and the group means and spread are filled into the same array,
+    so the frame is built from a single allocation. Columns: one per label, Group A,
+    Group B, Spread and Date, on a DatetimeIndex named Date.
+    """
+    legs = legs_A + legs_B
+    dates = [np.asarray(leg_dates, dtype="datetime64[ns]") for _, leg_dates, _ in legs]
+    index = np.unique(np.concatenate(dates))
+
+    n_legs = len(legs)
+    values = np.full((len(index), n_legs + 3), np.nan)
+    for j, ((_, _, leg_values), leg_dates) in enumerate(zip(legs, dates)):
+        values[np.searchsorted(index, leg_dates), j] = leg_values
+
+    complete = ~np.isnan(values[:, :n_legs]).any(axis=1)
+    values = values[complete]
+    values[:, n_legs] = values[:, :len(legs_A)].mean(axis=1)  # Group total is the mean of individual assets
+    values[:, n_legs + 1] = values[:, len(legs_A):n_legs].mean(axis=1)
+    #values[:, n_legs + 2] = values[:, n_legs + 1] - values[:, n_legs]
+    values[:, n_legs + 2] = values[:, n_legs] + values[:, n_legs + 1]
+
+    # A label used twice keeps its last leg as the column; both legs still count in the group mean
+    last_position = {label: j for j, (label, _, _) in enumerate(legs)}
+    keep = sorted(last_position.values()) + [n_legs, n_legs + 1, n_legs + 2]
+    columns = [legs[j][0] for j in keep[:-3]] + ["Group A", "Group B", "Spread"]
+
+    merged = pd.DataFrame(values[:, keep], index=pd.DatetimeIndex(index[complete], name="Date"), columns=columns)
     merged["Date"] = merged.index
+    return merged
+
+def group_legs(group, group_conversion, all_data):
+    """(legs, meta_info) for one group from fetched bars; legs are (label, dates, weighted values) for align_legs."""
+    legs = []
+    meta_info = []
+    for asset in group:
+        symbol = asset["symbol"]
+        label = asset["label"]
+        conversion = group_conversion.get(symbol, 1)  # Default to 1 if no conversion is provided
+        contract_month = symbol[-3:]
+
+        data = all_data.get(symbol, pd.DataFrame())
+        if data.empty:
+            continue
+
+        # Appending logic (expired contract + next contract via check_expiry) is not used here,
+        # only needed during seasonality
+        legs.append((label, pd.to_datetime(data["Date"]).to_numpy(), data["Close"].to_numpy(dtype=float) * asset["weight"] * conversion))
+        meta_info.append((symbol, label, contract_month))
+    return legs, meta_info
+
+# Seconds a merged frame is served as is before its last bars are fetched again
+# (matches the range cache's trust in today's still-changing bar)
+TAIL_REFRESH_SECONDS = 300
+MAX_MERGED_FRAMES = 16
+
+class _MergedEntry:
+    __slots__ = ("merged", "meta_A", "meta_B", "end_date", "refreshed")
+
+    def __init__(self, merged, meta_A, meta_B, end_date):
+        self.merged = merged
+        self.meta_A = meta_A
+        self.meta_B = meta_B
+        self.end_date = end_date
+        self.refreshed = time.monotonic()
+
+_merged_frames = OrderedDict()
+_merged_frames_lock = threading.Lock()
+
+def _merge_key(group_A, group_B, start_date, group_A_conversion, group_B_conversion):
+    def spec(group, conversions):
+        return tuple((a["symbol"], a["label"], a["weight"], conversions.get(a["symbol"], 1)) for a in group)
+    return spec(group_A, group_A_conversion), spec(group_B, group_B_conversion), pd.Timestamp(start_date)
+
+def refresh_tail(merged, group_A, group_B, end_date, group_A_conversion, group_B_conversion):
+    """
+    merged brought up to end_date by fetching only the bars from its last row onwards
+    (that row is re-read too, since today's bar changes during the session) and aligning
+    just those rows. Every merged column is row-local, so the result equals a full rebuild.
+    Returns None when the tail cannot be fetched or a leg has no bars in it.
+    """
+    tail_start = merged.index[-1]
+    symbols = [asset["symbol"] for asset in group_A + group_B]
+    frames, errors = get_mv_data_many(symbols, tail_start.to_pydatetime(), end_date, as_dict=True)
+    if errors:
+        print(f"Incremental refresh failed, rebuilding: {errors}")
+        return None
+
+    legs_A, _ = group_legs(group_A, group_A_conversion, frames)
+    legs_B, _ = group_legs(group_B, group_B_conversion, frames)
+    if len(legs_A) != len(group_A) or len(legs_B) != len(group_B):
+        return None
+    tail = align_legs(legs_A, legs_B)
+    return pd.concat([merged[merged.index < tail_start], tail])
 
-    # Add extra date features
-    merged["Year"] = merged.index.year
-    merged["Month"] = merged.index.month
-    merged["MonthName"] = merged.index.strftime('%b')
-    merged["DayOfWeek"] = merged.index.dayofweek
-    merged["DayName"] = merged.index.strftime('%a')
-
-    # Calculate returns for group totals and spread
-    merged["Return_A"] = merged["Group A"].pct_change()
-    merged["Return_B"] = merged["Group B"].pct_change()
-    merged["Return_Spread"] = merged["Spread"].pct_change()
-
-    return merged, "Group A", "Group B",meta_A,meta_B
-
+def process_commodities_data(group_A, group_B, start_date, end_date, available_commodities, group_A_conversion, group_B_conversion):
+    """
+    Fetch every leg of both groups in one batch and align them into merged_data
+    (see align_legs). Returns (merged, "Group A", "Group B", meta_A, meta_B); derived
+    date and return columns are added by the tabs that use them via with_derived_columns.
+
+    The merged frame is kept per (legs, start date). When the same legs come back with
+    the same or a later end date, only the bars after the last merged row are fetched
+    and appended (refresh_tail), at most every TAIL_REFRESH_SECONDS for an unchanged end date.
+    Callers always get their own copy, so writing to it never reaches the cached frame
+    shared by every rerun and session.
+    """
+    key = _merge_key(group_A, group_B, start_date, group_A_conversion, group_B_conversion)
+    with _merged_frames_lock:
+        entry = _merged_frames.get(key)
+
+    if entry is not None and end_date >= entry.end_date:
+        if end_date == entry.end_date and time.monotonic() - entry.refreshed < TAIL_REFRESH_SECONDS:
+            return entry.merged.copy(), "Group A", "Group B", list(entry.meta_A), list(entry.meta_B)
+        merged = refresh_tail(entry.merged, group_A, group_B, end_date, group_A_conversion, group_B_conversion)
+        if merged is not None:
+            entry = _MergedEntry(merged, entry.meta_A, entry.meta_B, end_date)
+            _remember_merged(key, entry)
+            return entry.merged.copy(), "Group A", "Group B", list(entry.meta_A), list(entry.meta_B)
+
+    all_data = load_commodities_data([asset["symbol"] for asset in group_A + group_B], start_date, end_date)
+    legs_A, meta_A = group_legs(group_A, group_A_conversion, all_data)
+    legs_B, meta_B = group_legs(group_B, group_B_conversion, all_data)
+
+    if not legs_A or not legs_B:
+        st.error("Failed to load data for one or both groups.")
+        return pd.DataFrame(), "Group A", "Group B", meta_A, meta_B
+
+    merged = align_legs(legs_A, legs_B)
+    # Only frames with every leg present can be extended leg by leg
+    if not merged.empty and len(legs_A) == len(group_A) and len(legs_B) == len(group_B):
+        _remember_merged(key, _MergedEntry(merged, meta_A, meta_B, end_date))
+        merged = merged.copy()
+    return merged, "Group A", "Group B", meta_A, meta_B
+
+def _remember_merged(key, entry):
+    with _merged_frames_lock:
+        _merged_frames[key] = entry
+        _merged_frames.move_to_end(key)
+        while len(_merged_frames) > MAX_MERGED_FRAMES:
+            _merged_frames.popitem(last=False)
@@ -1,11 +1,14 @@
 import pandas as pd
+import numpy as np
 from datetime import datetime
-from gcc_sparta_lib import get_mv_data
+from contracts import ContractArray
+from gcc_sparta_lib import get_mv_data_many
+from trading_calendar import get_trading_calendar
+from downsample import downsample_indices
+from figure_cache import cached_plotly_chart, figure_key
 from datetime import datetime, timedelta
 import streamlit as st
-import time
 import plotly.graph_objects as go
-import plotly.express as px
 # Today's date
 end_date = datetime.today()
 
@@ -28,118 +31,78 @@ month_code_map = {
     'Z': 12  # Dec
 }
 
+# Years of contract history tabs 5 and 6 load per instrument
+HISTORY_YEARS = 10
+
 # Get the current month
 current_month = datetime.now().month
 current_year = datetime.now().year
 
 # Function to check if an instrument has expired
 def check_instrument_expiry_month_only(instruments):
-    expired_instruments = []
-
-    for instrument in instruments:
-        #print(f"Processing instrument: {instrument}")  # Debugging: Show current instrument
-
-        # Step 1: Check if the instrument code is long enough
-        if len(instrument) < 4:
-            #print(f"Warning: Instrument code {instrument} is too short to process. Skipping...")
-            continue
-        
-        # Step 2: Drop the last two characters (validate input length)
-        shortened_instrument = instrument[:-2]
-        #print(f"Shortened instrument (last two characters removed): {shortened_instrument}")  # Debugging: Show shortened instrument
-
-        # Step 3: Take the last character as the month character
-        month_char = shortened_instrument[-1]
-        #print(f"Extracted month character: {month_char}")  # Debugging: Show extracted month character
-
-        # Step 4: Get the corresponding month number from the month_code_map
-        instrument_month = month_code_map.get(month_char, None)
-
-        if instrument_month is None:
-            #print(f"Invalid month code: {month_char} in {instrument}. Skipping...")  # Debugging: Show invalid month code
-            continue
-        
-        # Step 5: Compare the current month with the instrument's month
-       # print(f"Instrument month: {instrument_month}, Current month: {current_month}")  # Debugging: Show month comparison
-
-        if current_month >= instrument_month:
-            expired_instruments.append((instrument, "expired"))
-        else:
-            expired_instruments.append((instrument, "valid"))
-    
-    return expired_instruments
-
-def generate_instrument_lists(instrument_expiry_check):
+    """
+    Month-only expiry rule: a contract is 'expired' once the current month reaches its month,
+    regardless of year. Instruments without a valid month code are skipped.
+    """
+    contracts = ContractArray.from_symbols(instruments)
+    expired = contracts.month_passed(current_month)
+    return [
+        (instrument, "expired" if is_expired else "valid")
+        for instrument, is_valid, is_expired in zip(instruments, contracts.valid, expired)
+        if is_valid
+    ]
+
+def generate_instrument_lists(instrument_expiry_check, years_back=HISTORY_YEARS):
     """
     Generate a new list of instruments based on expiry status and years.
     """
     # Get current year and calculate start_year and end_year
     current_year = datetime.now().year
-    start_year = current_year - 10
-
-    # List to store the new instrument lists
-    new_instrument_lists = []
-
-    # Process each instrument and create the desired lists
-    for instrument, status in instrument_expiry_check:
-        # Calculate end_year based on expiration status
-        end_year = current_year + 1 if status == "expired" else current_year
+    start_year = current_year - years_back
 
-        # Generate the list of years
-        year_range = [str(year)[2:] for year in range(start_year, end_year + 1)]
+    if not instrument_expiry_check:
+        return [], []
 
-        # Remove the last 2 characters from the instrument and concatenate with the years
-        instrument_base = instrument[:-2]  # Drop last 2 characters
-        new_instrument_list = [instrument_base + year for year in year_range]
+    instruments, statuses = zip(*instrument_expiry_check)
+    contracts = ContractArray.from_symbols(instruments)
 
-        # Add the new instrument list to the result
-        new_instrument_lists.append(new_instrument_list)
+    # Expired instruments extend one more year; build a (instrument x year) grid of symbols at once
+    end_years = np.where(np.array(statuses) == "expired", current_year + 1, current_year)
+    years = np.arange(start_year, current_year + 2)
+    symbol_grid = np.stack([contracts.shift_year(year - contracts.years).symbols() for year in years], axis=1)
+    in_range = years[None, :] <= end_years[:, None]
 
-    # Concatenate all the lists together and remove duplicates
-    all_instruments = [instrument for sublist in new_instrument_lists for instrument in sublist]
-    unique_instruments = list(set(all_instruments))
-
-    # Sort the unique instruments (optional, but keeps the order consistent)
-    unique_instruments.sort()
+    new_instrument_lists = [row[mask].tolist() for row, mask in zip(symbol_grid, in_range)]
+    unique_instruments = sorted(set(symbol_grid[in_range].tolist()))
 
     return new_instrument_lists,unique_instruments
 
-@st.cache_data
-def concatenate_commodity_data_for_unique_instruments(unique_instruments, max_retries=5, retry_delay=5):
+def fetch_instruments_concurrently(unique_instruments, max_retries=5, retry_delay=5, on_progress=None):
+    """
+    Fetch all instruments over the 15-year window with one get_mv_data_many batch.
+    Returns (list of DataFrames in input order, failed instruments).
+    """
+    frames, errors = get_mv_data_many(unique_instruments, start_date, end_date, as_dict=True,
+                                      max_attempts=max_retries, retry_delay=retry_delay, on_progress=on_progress)
     fetched_data = []
-    failed_instruments = []
+    for instrument, df_commodity_data in frames.items():
+        df_commodity_data['Instrument'] = instrument
+        fetched_data.append(df_commodity_data)
+    return fetched_data, list(errors)
 
+@st.cache_data
+def concatenate_commodity_data_for_unique_instruments(unique_instruments, max_retries=5, retry_delay=5):
     progress_bar = st.progress(0)
     status_text = st.empty()
 
-    total_instruments = len(unique_instruments)
-
-    for idx, instrument in enumerate(unique_instruments, start=1):
-        success = False
-        for attempt in range(1, max_retries + 1):
-            try:
-                with st.spinner(f"Attempt {attempt}/{max_retries} - Fetching data for {instrument}..."):
-                    df_commodity_data = get_mv_data(instrument, start_date, end_date, False)
-
-                if df_commodity_data is not None and not df_commodity_data.empty:
-                    df_commodity_data['Instrument'] = instrument
-                    fetched_data.append(df_commodity_data)
-                    success = True
-                    break
-                else:
-                    print(f" No data returned for {instrument} on attempt {attempt}. Retrying...")
-            except Exception as e:
-                print(f" Error on attempt {attempt} for {instrument}: {e}")
-            
-            time.sleep(retry_delay)
-
-        if not success:
-            failed_instruments.append(instrument)
-
-        # Update progress bar
-        progress = idx / total_instruments
-        progress_bar.progress(progress)
-        status_text.text(f"Processed {idx}/{total_instruments} instruments")
+    def update_progress(done, total, instrument, ok):
+        progress_bar.progress(done / total)
+        status_text.text(f"Processed {done}/{total} instruments")
+
+    with st.spinner(f"Fetching data for {len(unique_instruments)} instruments..."):
+        fetched_data, failed_instruments = fetch_instruments_concurrently(
+            unique_instruments, max_retries, retry_delay, on_progress=update_progress
+        )
 
     if failed_instruments:
         st.error(f"❌ Failed to fetch data for the following instruments after {max_retries} attempts: {', '.join(failed_instruments)}")
@@ -151,66 +114,74 @@ def concatenate_commodity_data_for_unique_instruments(unique_instruments, max_re
 
 @st.cache_data
 def concatenate_commodity_data_for_unique_instruments_mini(unique_instruments, max_retries=5, retry_delay=5):
-    fetched_data = []
-    failed_instruments = []
-
-    for idx, instrument in enumerate(unique_instruments, start=1):
-        success = False
-        for attempt in range(1, max_retries + 1):
-            try:
-                with st.spinner(f"Attempt {attempt}/{max_retries} - Fetching data for {instrument}..."):
-                    df_commodity_data = get_mv_data(instrument, start_date, end_date, False)
-
-                if df_commodity_data is not None and not df_commodity_data.empty:
-                    df_commodity_data['Instrument'] = instrument
-                    fetched_data.append(df_commodity_data)
-                    success = True
-                    break
-                else:
-                    print(f" No data returned for {instrument} on attempt {attempt}. Retrying...")
-            except Exception as e:
-                print(f" Error on attempt {attempt} for {instrument}: {e}")
-            
-            time.sleep(retry_delay)
-
-        if not success:
-            failed_instruments.append(instrument)
+    with st.spinner(f"Fetching data for {len(unique_instruments)} instruments..."):
+        fetched_data, _ = fetch_instruments_concurrently(unique_instruments, max_retries, retry_delay)
 
     df_final = pd.concat(fetched_data, ignore_index=True) if fetched_data else pd.DataFrame()
     return df_final
 
 def check_instrument_expiry_dict(instruments):
-    instrument_status = []
-    
-    # Get the current year and month for comparison
-    current_date = datetime.now()
-    current_year = current_date.year
-    current_month = current_date.month
+    """
+    Year-and-month expiry rule: 'expired' if the contract month is before the current month.
+    Short symbols are 'invalid', symbols without a valid month code are 'invalid month'.
+    """
+    contracts = ContractArray.from_symbols(instruments)
+    expired = contracts.is_expired(datetime.now(), inclusive=False)
 
-    for instrument in instruments:
+    instrument_status = []
+    for instrument, is_valid, is_expired in zip(instruments, contracts.valid, expired):
         if len(instrument) < 4:
             instrument_status.append((instrument, "invalid"))  # Short instruments are invalid
-            continue
-        
-        # Extract the last two digits of the year and convert them to a full year
-        instrument_year = 2000 + int(instrument[-2:])
-        
-        # Extract the month character and map it to a month number
-        month_char = instrument[-3]
-        instrument_month = month_code_map.get(month_char, None)
-
-        if instrument_month is None:
+        elif not is_valid:
             instrument_status.append((instrument, "invalid month"))
-            continue
-        
-        # Determine if the instrument is expired or valid
-        if (instrument_year < current_year) or (instrument_year == current_year and instrument_month < current_month):
-            instrument_status.append((instrument, "expired"))
         else:
-            instrument_status.append((instrument, "valid"))
-    
+            instrument_status.append((instrument, "expired" if is_expired else "valid"))
+
     return instrument_status
 
+def month_tick_positions(calendar, anchor):
+    """Trading-day offsets of the first session of each of the 12 months starting at anchor."""
+    month_starts = pd.date_range(anchor, periods=12, freq='MS')
+    return calendar.offsets(month_starts, anchor).tolist()
+
+def run_bounds(*keys):
+    """(starts, ends) of the runs of equal values in rows already sorted by keys."""
+    n = len(keys[0])
+    if n == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    changed = np.zeros(n - 1, dtype=bool)
+    for key in keys:
+        key = np.asarray(key)
+        changed |= key[1:] != key[:-1]
+    starts = np.concatenate([[0], np.flatnonzero(changed) + 1])
+    return starts, np.append(starts[1:], n)
+
+def add_line_traces(fig, x, y, starts, ends, names, lines, opacity=1.0, hovertext=None):
+    """
+    One go.Scattergl per distinct (name, line style) over the runs starts[i]:ends[i] of x / y.
+    Runs sharing a name and style become a single trace, separated by NaN gaps.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    batches = {}
+    for start, end, name, line in zip(starts, ends, names, lines):
+        keep = start + downsample_indices(x[start:end], y[start:end])
+        batches.setdefault((name, repr(line)), (line, []))[1].append(keep)
+
+    for (name, _), (line, runs) in batches.items():
+        gap = np.array([-1])
+        rows = np.concatenate([part for run in runs for part in (run, gap)][:-1])
+        gaps = rows < 0
+        fig.add_trace(go.Scattergl(
+            x=np.where(gaps, np.nan, x[rows]),
+            y=np.where(gaps, np.nan, y[rows]),
+            mode='lines',
+            name=name,
+            line=line,
+            opacity=opacity,
+            hovertext=None if hovertext is None else np.where(gaps, None, np.asarray(hovertext, dtype=object)[rows]),
+        ))
+
 def plot_seasonality_chart_tab5(df_filtered, meta_A_month_int):
     import plotly.graph_objects as go
     import pandas as pd
@@ -220,33 +191,6 @@ def plot_seasonality_chart_tab5(df_filtered, meta_A_month_int):
     df_expired = df_filtered[df_filtered['ExpiryStatus'] == 'expired']
     df_valid = df_filtered[df_filtered['ExpiryStatus'] == 'valid']
 
-    fig = go.Figure()
-    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                   'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-
-    # Generate unique colors for each instrument
-    color_palette = itertools.cycle([
-        "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728",
-        "#9467bd", "#8c564b", "#e377c2", "#7f7f7f",
-        "#bcbd22", "#17becf"
-    ])
-    instrument_colors = {instrument: next(color_palette) for instrument in df_filtered['Instrument'].unique()}
-
-    # === Plot expired instruments ===
-    for (instrument, year), group in df_expired.groupby(['Instrument', 'Year']):
-        group = group.sort_values('TradingDayOfYear').tail(252).reset_index(drop=True)
-        group = group.copy()
-        group.loc[:, 'trading_day_index'] = range(len(group))
-        fig.add_trace(go.Scatter(
-            x=group['trading_day_index'],
-            y=group['Close'],
-            mode='lines',
-            name=f"{instrument} - {year} (Expired)",
-            line=dict(dash='dash', width=2, color=instrument_colors[instrument]),
-            opacity=0.7
-        ))
-
-    # === Plot valid instruments ===
     if df_valid.empty:
         st.write("No valid instruments found.")
         return
@@ -256,62 +200,73 @@ def plot_seasonality_chart_tab5(df_filtered, meta_A_month_int):
     start_date = pd.Timestamp(year=start_year, month=meta_A_month_int, day=1)
     previous_year_date = start_date - pd.DateOffset(years=1)
 
-    def date_to_trading_index(date, start):
-        days_diff = (date - start).days
-        trading_index = days_diff * 5 / 7
-        return trading_index
-
     # Try to get valid data from the initial start_date
-    valid_data = df_valid[df_valid['Date'] >= start_date].copy()
+    valid_data = df_valid[df_valid['Date'] >= start_date]
     used_start_date = start_date
 
     if valid_data.empty:
         # If no data, try from the previous year
-        valid_data = df_valid[df_valid['Date'] >= previous_year_date].copy()
+        valid_data = df_valid[df_valid['Date'] >= previous_year_date]
         used_start_date = previous_year_date
 
-        if valid_data.empty:
-            st.write("No valid data after adjusted start date.")
-        else:
-            for (instrument, year), group in valid_data.groupby(['Instrument', 'Year']):
-                group = group.sort_values('Date').copy()
-                group.loc[:, 'trading_day_index'] = group['Date'].apply(lambda d: date_to_trading_index(d, used_start_date))
-                fig.add_trace(go.Scatter(
-                    x=group['trading_day_index'],
-                    y=group['Close'],
-                    mode='lines',
-                    name=f"{instrument} - {year} (Valid)",
-                    line=dict(dash='solid', width=3, color=instrument_colors[instrument]),
-                    opacity=1
-                ))
-    else:
-        for (instrument, year), group in valid_data.groupby(['Instrument', 'Year']):
-            group = group.sort_values('Date').copy()
-            group.loc[:, 'trading_day_index'] = group['Date'].apply(lambda d: date_to_trading_index(d, used_start_date))
-            fig.add_trace(go.Scatter(
-                x=group['trading_day_index'],
-                y=group['Close'],
-                mode='lines',
-                name=f"{instrument} - {year} (Valid)",
-                line=dict(dash='solid', width=3, color=instrument_colors[instrument]),
-                opacity=1
-            ))
-
-
-    # Month ticks
-    month_positions = [i * 21 for i in range(12)]
-    month_labels = [month_names[(meta_A_month_int - 1 + i) % 12] for i in range(12)]
-
-    fig.update_layout(
-        title=f"📅 Seasonality Chart (Starting from {month_names[meta_A_month_int - 1]})",
-        xaxis=dict(title="Month", tickvals=month_positions, ticktext=month_labels),
-        yaxis_title="Close Price",
-        height=600,
-        template="plotly_white",
-        showlegend=True
-    )
-
-    st.plotly_chart(fig, use_container_width=True)
+    if valid_data.empty:
+        st.write("No valid data after adjusted start date.")
+
+    def build_figure():
+        fig = go.Figure()
+        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                       'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+        # Generate unique colors for each instrument
+        color_palette = itertools.cycle([
+            "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728",
+            "#9467bd", "#8c564b", "#e377c2", "#7f7f7f",
+            "#bcbd22", "#17becf"
+        ])
+        instrument_colors = {instrument: next(color_palette) for instrument in df_filtered['Instrument'].unique()}
+
+        calendar = get_trading_calendar()
+
+        # === Plot expired instruments: the last 252 rows of each contract-year, from its own first date ===
+        expired = df_expired.sort_values(['Instrument', 'Year', 'Date'])
+        expired = expired[expired.groupby(['Instrument', 'Year']).cumcount(ascending=False) < 252]
+        instruments, years = expired['Instrument'].to_numpy(), expired['Year'].to_numpy()
+        starts, ends = run_bounds(instruments, years)
+        dates = expired['Date'].to_numpy()
+        add_line_traces(
+            fig, calendar.offsets(dates, np.repeat(dates[starts], ends - starts)), expired['Close'], starts, ends,
+            [f"{instruments[i]} - {years[i]} (Expired)" for i in starts],
+            [dict(dash='dash', width=2, color=instrument_colors[instruments[i]]) for i in starts],
+            opacity=0.7,
+        )
+
+        # === Plot valid instruments, all from the shared anchor ===
+        valid = valid_data.sort_values(['Instrument', 'Year', 'Date'])
+        instruments, years = valid['Instrument'].to_numpy(), valid['Year'].to_numpy()
+        starts, ends = run_bounds(instruments, years)
+        add_line_traces(
+            fig, calendar.offsets(valid['Date'], used_start_date), valid['Close'], starts, ends,
+            [f"{instruments[i]} - {years[i]} (Valid)" for i in starts],
+            [dict(dash='solid', width=3, color=instrument_colors[instruments[i]]) for i in starts],
+        )
+
+        # Month ticks at each month's first session after the anchor
+        month_positions = month_tick_positions(calendar, used_start_date)
+        month_labels = [month_names[(meta_A_month_int - 1 + i) % 12] for i in range(12)]
+
+        fig.update_layout(
+            title=f"📅 Seasonality Chart (Starting from {month_names[meta_A_month_int - 1]})",
+            xaxis=dict(title="Month", tickvals=month_positions, ticktext=month_labels),
+            yaxis_title="Close Price",
+            height=600,
+            template="plotly_white",
+            showlegend=True
+        )
+        return fig
+
+    key = figure_key("tab5_seasonality", df_filtered[['Instrument', 'Year', 'Date', 'Close', 'ExpiryStatus']],
+                     meta_A_month_int, used_start_date)
+    cached_plotly_chart(key, build_figure)
 
 # Function to check if a month code is expired or running based on the current month
 def check_month_status(month_code_map):
@@ -333,73 +288,54 @@ def plot_spread_seasonality(df_final, base_month_int,current_year):
     # Extract year from Base_Instrument (last 2 digits)
     df_final['Year'] = df_final['Base_Instrument'].str.extract(r'(\d{2})$').astype(int) + 2000
 
-    # Sort in descending order by Year and Date to get the most recent data first
-    df_final = df_final.sort_values(['Year', 'Date'], ascending=[False, False]).copy()
-
-    # Compute trading day index per year (1 to 252 max)
-    df_final['TradingDayOfYear'] = (
-        df_final.groupby(['Year'])
-        .cumcount() + 1
-    )
-
-    # Get the latest year
-    latest_year = df_final['Year'].max()
-    start_date_for_latest_year = pd.to_datetime(f"{latest_year-1}-{base_month_int:02d}-01")
-    # if latest_year > current_year:
-    #     # Filter data for the latest year to only include dates starting from the 1st day of base_month_int
-    #     start_date_for_latest_year = pd.to_datetime(f"{latest_year-1}-{base_month_int:02d}-01")
-    # else:
-    #     start_date_for_latest_year = pd.to_datetime(f"{latest_year-1}-{base_month_int:02d}-01")
-    df_final.loc[df_final['Year'] == latest_year, 'Date'] = df_final['Date'].where(df_final['Date'] >= start_date_for_latest_year)
-
-    # After applying the date filter, we remove rows with NaT (Not a Time) for the latest year
-    df_final = df_final.dropna(subset=['Date'])
-
-    # Select the latest 252 trading days for each year
-    df_final = df_final.groupby('Year').head(252)
-
-    # Plot
-    fig = go.Figure()
-
-    for year, group in df_final.groupby('Year'):
-        # Check if the year is the latest one, and bold it in the legend and graph
-        year_label = f"<b>{year}</b>" if year == latest_year else str(year)
-        
-        line_style = dict(width=4, dash='solid') if year == latest_year else dict(width=2, dash='dot')
-        
-        fig.add_trace(go.Scatter(
-            x=group['TradingDayOfYear'],
-            y=group['Spread'],
-            mode='lines',
-            name=year_label,
-            line=line_style,
-            hovertext=group['Date'].dt.strftime('%Y-%m-%d'),
-            opacity=0.85
-        ))
-
-    # X-axis month ticks starting from meta_A_month_int
-    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                   'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-    month_labels = [month_names[(base_month_int - 1 + i) % 12] for i in range(12)]
-    month_positions = [i * 21 for i in range(12)]  # ~21 trading days per month
-
-    fig.update_layout(
-        title=f"📊 Spread Seasonality Chart (Starting from {month_names[base_month_int - 1]})",
-        xaxis=dict(title="Month", tickvals=month_positions, ticktext=month_labels),
-        yaxis_title="Spread",
-        height=600,
-        template="plotly_white",
-        showlegend=True
-    )
-
-    st.plotly_chart(fig, use_container_width=True)
+    def build_figure():
+        # Trading-day offset from each contract's anchor: the 1st of the base month a year before the contract year
+        calendar = get_trading_calendar()
+        latest_year = df_final['Year'].max()
+        anchors = pd.to_datetime(pd.DataFrame({'year': df_final['Year'] - 1, 'month': base_month_int, 'day': 1}))
+        df_plot = df_final.assign(TradingDayOfYear=calendar.offsets(df_final['Date'], anchors))
+
+        # Keep the 252 trading days following each anchor
+        df_plot = df_plot[(df_plot['TradingDayOfYear'] >= 0) & (df_plot['TradingDayOfYear'] < 252)]
+        df_plot = df_plot.sort_values(['Year', 'Date'])
+
+        # One line per contract year; the latest is bold and solid
+        fig = go.Figure()
+        years = df_plot['Year'].to_numpy()
+        starts, ends = run_bounds(years)
+        add_line_traces(
+            fig, df_plot['TradingDayOfYear'], df_plot['Spread'], starts, ends,
+            [f"<b>{years[i]}</b>" if years[i] == latest_year else str(years[i]) for i in starts],
+            [dict(width=4, dash='solid') if years[i] == latest_year else dict(width=2, dash='dot') for i in starts],
+            opacity=0.85,
+            hovertext=np.datetime_as_string(df_plot['Date'].to_numpy(), unit='D'),
+        )
+
+        # X-axis month ticks starting from meta_A_month_int
+        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                       'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+        month_labels = [month_names[(base_month_int - 1 + i) % 12] for i in range(12)]
+        month_positions = month_tick_positions(calendar, pd.Timestamp(year=latest_year - 1, month=base_month_int, day=1))
+
+        fig.update_layout(
+            title=f"📊 Spread Seasonality Chart (Starting from {month_names[base_month_int - 1]})",
+            xaxis=dict(title="Month", tickvals=month_positions, ticktext=month_labels),
+            yaxis_title="Spread",
+            height=600,
+            template="plotly_white",
+            showlegend=True
+        )
+        return fig
+
+    cached_plotly_chart(figure_key("tab6_spread_seasonality", df_final[['Date', 'Year', 'Spread']], base_month_int), build_figure)
 
 def plot_kde_distribution(df_final):
     import numpy as np
     import pandas as pd
     import plotly.graph_objects as go
     from plotly.subplots import make_subplots
-    from scipy.stats import gaussian_kde, norm
+    from statistics import NormalDist
+    from kde import BinnedKDE
     import streamlit as st
 
     # Extract spread data
@@ -409,95 +345,98 @@ def plot_kde_distribution(df_final):
     std_dev = np.std(spread_data)
     
     # Confidence interval
-    z_score = norm.ppf(0.975)
+    z_score = NormalDist().inv_cdf(0.975)
     ci_lower = mean_val - z_score * std_dev / np.sqrt(len(spread_data))
     ci_upper = mean_val + z_score * std_dev / np.sqrt(len(spread_data))
 
-    # KDE
-    kde = gaussian_kde(spread_data)
-    x_range = np.linspace(min(spread_data), max(spread_data), 1000)
-    kde_values = kde(x_range)
-
-    # Subplots
-    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3], vertical_spacing=0.08)
-
-    # KDE + histogram
-    fig.add_trace(go.Histogram(
-        x=spread_data,
-        nbinsx=30,
-        histnorm='probability density',
-        marker_color='rgba(100, 100, 255, 0.3)',
-        opacity=0.6,
-        name='Histogram'
-    ), row=1, col=1)
-
-    fig.add_trace(go.Scatter(
-        x=x_range,
-        y=kde_values,
-        mode='lines',
-        line=dict(color='royalblue', width=3),
-        name='KDE'
-    ), row=1, col=1)
-
-    # Mean, median, CI
-    for val, label, style in [
-        (mean_val, f"Mean: {mean_val:.4f}", 'solid'),
-        (median_val, f"Median: {median_val:.4f}", 'dash'),
-        (ci_lower, f"95% CI Lower", 'dot'),
-        (ci_upper, f"95% CI Upper", 'dot')
-    ]:
+    def build_figure():
+        # KDE
+        kde = BinnedKDE(spread_data)
+        x_range = np.linspace(min(spread_data), max(spread_data), 1000)
+        kde_values = kde(x_range)
+
+        # Subplots
+        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3], vertical_spacing=0.08)
+
+        # KDE + histogram
+        fig.add_trace(go.Histogram(
+            x=spread_data,
+            nbinsx=30,
+            histnorm='probability density',
+            marker_color='rgba(100, 100, 255, 0.3)',
+            opacity=0.6,
+            name='Histogram'
+        ), row=1, col=1)
+
         fig.add_trace(go.Scatter(
-            x=[val, val],
-            y=[0, max(kde_values) * 1.05],
+            x=x_range,
+            y=kde_values,
             mode='lines',
-            name=label,
-            line=dict(color='gray', dash=style, width=2),
-            hoverinfo='name'
+            line=dict(color='royalblue', width=3),
+            name='KDE'
         ), row=1, col=1)
 
-    # Boxplot
-    fig.add_trace(go.Box(
-        x=spread_data,
-        boxpoints='outliers',
-        marker_color='royalblue',
-        name='Boxplot',
-        boxmean='sd'
-    ), row=2, col=1)
-
-    # Layout
-    fig.update_layout(
-        title=dict(text="Spread Distribution", x=0.5, font_size=20),
-        height=700,
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="center",
-            x=0.5
-        ),
-        margin=dict(t=80, l=40, r=40, b=60),
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-    )
-
-    fig.update_xaxes(
-        title_text="Spread Value",
-        showgrid=True,
-        gridcolor='rgba(200,200,200,0.2)',
-        zeroline=False
-    )
-    fig.update_yaxes(
-        title_text="Density",
-        showgrid=True,
-        gridcolor='rgba(200,200,200,0.2)',
-        zeroline=False,
-        row=1, col=1
-    )
-    fig.update_yaxes(visible=False, row=2, col=1)
-
-    # Streamlit display
-    st.plotly_chart(fig, use_container_width=True)
+        # Mean, median, CI
+        for val, label, style in [
+            (mean_val, f"Mean: {mean_val:.4f}", 'solid'),
+            (median_val, f"Median: {median_val:.4f}", 'dash'),
+            (ci_lower, f"95% CI Lower", 'dot'),
+            (ci_upper, f"95% CI Upper", 'dot')
+        ]:
+            fig.add_trace(go.Scatter(
+                x=[val, val],
+                y=[0, max(kde_values) * 1.05],
+                mode='lines',
+                name=label,
+                line=dict(color='gray', dash=style, width=2),
+                hoverinfo='name'
+            ), row=1, col=1)
+
+        # Boxplot
+        fig.add_trace(go.Box(
+            x=spread_data,
+            boxpoints='outliers',
+            marker_color='royalblue',
+            name='Boxplot',
+            boxmean='sd'
+        ), row=2, col=1)
+
+        # Layout
+        fig.update_layout(
+            title=dict(text="Spread Distribution", x=0.5, font_size=20),
+            height=700,
+            showlegend=True,
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="center",
+                x=0.5
+            ),
+            margin=dict(t=80, l=40, r=40, b=60),
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+        )
+
+        fig.update_xaxes(
+            title_text="Spread Value",
+            showgrid=True,
+            gridcolor='rgba(200,200,200,0.2)',
+            zeroline=False
+        )
+        fig.update_yaxes(
+            title_text="Density",
+            showgrid=True,
+            gridcolor='rgba(200,200,200,0.2)',
+            zeroline=False,
+            row=1, col=1
+        )
+        fig.update_yaxes(visible=False, row=2, col=1)
+
+        # Streamlit display
+        return fig
+
+    cached_plotly_chart(figure_key("tab6_spread_distribution", spread_data), build_figure)
 
     with st.expander("📊 Distribution Stats"):
         st.metric("Mean", f"{mean_val:.4f}")
@@ -0,0 +1,97 @@
+"""
+Chart-data reduction with Largest-Triangle-Three-Buckets (LTTB).
+
+Long daily series are cut to about `max_points` per trace before they reach
+matplotlib or plotly. On top of the LTTB picks, every finite run keeps its minimum
+and maximum, the last RECENT_POINTS rows stay at full resolution, and gaps (NaN)
+survive so broken lines still render broken. Traces already under the budget pass
+through untouched.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+MAX_CHART_POINTS = int(os.environ.get("SPARTAN_CHART_POINTS", 1500))
+RECENT_POINTS = 60
+
+
+def _numeric(values):
+    values = values.to_numpy() if isinstance(values, (pd.Series, pd.Index)) else np.asarray(values)
+    if values.dtype.kind == "M":
+        values = values.astype("datetime64[ns]").astype(np.int64)
+    return values.astype(float)
+
+
+def lttb(x, y, n_out):
+    """Positions (sorted, first and last included) of the n_out points LTTB keeps from finite x, y."""
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+
+    # n_out - 2 buckets over the interior points; each bucket is compared with the mean of the next
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(np.append(edges, n))
+    mean_x = np.add.reduceat(x, edges) / counts
+    mean_y = np.add.reduceat(y, edges) / counts
+    mean_x[-1], mean_y[-1] = x[-1], y[-1]
+
+    picks = np.empty(n_out, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - mean_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (mean_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        picks[i + 1] = a
+    return picks
+
+
+def downsample_indices(x, y, max_points=None, recent=RECENT_POINTS):
+    """
+    Row positions to plot for one trace: LTTB over each finite run (budget shared in
+    proportion to run length), plus each run's min/max, the first NaN after each run and
+    the last `recent` rows.
+    """
+    max_points = max_points or MAX_CHART_POINTS
+    y_values = _numeric(y)
+    n = len(y_values)
+    if n <= max_points:
+        return np.arange(n)
+    x_values = _numeric(x)
+
+    finite = np.isfinite(y_values) & np.isfinite(x_values)
+    edges = np.diff(np.concatenate([[0], finite.astype(np.int8), [0]]))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    budget = max(max_points - recent, 3 * len(starts))
+    keep = [np.arange(max(n - recent, 0), n), ends[ends < n]]
+    for start, end in zip(starts, ends):
+        run_x, run_y = x_values[start:end], y_values[start:end]
+        run_points = max(3, int(budget * (end - start) / finite.sum()))
+        keep.append(start + lttb(run_x, run_y, run_points))
+        keep.append(start + np.array([np.argmin(run_y), np.argmax(run_y)]))
+    return np.unique(np.concatenate(keep))
+
+
+def _take(values, idx):
+    if isinstance(values, (pd.Series, pd.Index)):
+        return values[idx] if isinstance(values, pd.Index) else values.iloc[idx]
+    return np.asarray(values)[idx]
+
+
+def downsample(x, y, max_points=None, recent=RECENT_POINTS):
+    """(x, y) reduced for plotting; pandas inputs come back as pandas objects."""
+    idx = downsample_indices(x, y, max_points, recent)
+    if len(idx) == len(y):
+        return x, y
+    return _take(x, idx), _take(y, idx)
+
+
+def downsample_frame(df, x_column, y_column, max_points=None, recent=RECENT_POINTS):
+    """Rows of df kept when plotting y_column against x_column (other columns ride along, e.g. hover text)."""
+    idx = downsample_indices(df[x_column], df[y_column], max_points, recent)
+    return df if len(idx) == len(df) else df.iloc[idx]
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from fingerprint_cache import FingerprintCache, frame_fingerprint
+
+TOP_EPISODES = 5
+
+EPISODE_COLUMNS = ["Peak", "Trough", "Recovery", "Depth", "Decline Days", "Recovery Days", "Total Days"]
+
+
+def wealth_curves(returns):
+    """Compounded value of 1 invested on the first day, per column of a (n, k) returns array."""
+    return np.cumprod(1 + np.asarray(returns, dtype=float), axis=0)
+
+
+def underwater(wealth):
+    """Fractional distance below the running peak (0 at a new high, negative while under water)."""
+    return wealth / np.maximum.accumulate(wealth, axis=0) - 1
+
+
+def rolling_max_drawdown(wealth, window):
+    """
+    Worst peak-to-trough drawdown inside each trailing window of `window` rows, per column;
+    NaN until the first full window.
+
+    O(n) per column: a segment's (max, min, max drawdown) combines associatively, so the rows
+    are cut into blocks of `window` and every window is the suffix of one block joined to the
+    prefix of the next, both precomputed with running accumulates (van Herk/Gil-Werman).
+    """
+    wealth = np.asarray(wealth, dtype=float)
+    n, k = wealth.shape
+    result = np.full((n, k), np.nan)
+    if window < 2 or n < window:
+        return result
+
+    # Pad with the last row (which changes no summary) to whole blocks of `window` rows
+    blocks = -(-n // window)
+    padded = np.concatenate([wealth, np.repeat(wealth[-1:], blocks * window - n, axis=0)]).reshape(blocks, window, k)
+
+    # Prefix summaries: from each block's first row to row t
+    prefix_max = np.maximum.accumulate(padded, axis=1)
+    prefix_min = np.minimum.accumulate(padded, axis=1)
+    prefix_drawdown = np.minimum.accumulate(padded / prefix_max - 1, axis=1)
+
+    # Suffix summaries: from row s to its block's last row
+    reverse = padded[:, ::-1]
+    suffix_max = np.maximum.accumulate(reverse, axis=1)[:, ::-1]
+    suffix_min = np.minimum.accumulate(reverse, axis=1)[:, ::-1]
+    later_min = np.concatenate([suffix_min[:, 1:], np.full((blocks, 1, k), np.inf)], axis=1)
+    drop_from_row = np.minimum(later_min / padded - 1, 0)  # worst fall with row s as the peak
+    suffix_drawdown = np.minimum.accumulate(drop_from_row[:, ::-1], axis=1)[:, ::-1]
+
+    prefix_max, prefix_min, prefix_drawdown, suffix_max, suffix_drawdown = (
+        a.reshape(-1, k)[:n] for a in (prefix_max, prefix_min, prefix_drawdown, suffix_max, suffix_drawdown))
+    starts = np.arange(n - window + 1)
+    ends = starts + window - 1
+    joined = np.minimum(np.minimum(suffix_drawdown[starts], prefix_drawdown[ends]),
+                        prefix_min[ends] / suffix_max[starts] - 1)
+    # A window starting on a block boundary is that whole block
+    aligned = starts % window == 0
+    joined[aligned] = suffix_drawdown[starts[aligned]]
+    result[window - 1:] = joined
+    return result
+
+
+def episodes(drawdown, index=None, top_n=TOP_EPISODES):
+    """
+    The top_n deepest drawdown episodes of one underwater curve, deepest first.
+    An episode runs from the last peak to the first row back at that peak (Recovery is
+    NaT and the durations run to the last row when it has not recovered yet).
+    Durations are counted in rows, i.e. trading days.
+    """
+    drawdown = np.asarray(drawdown, dtype=float)
+    index = pd.RangeIndex(len(drawdown)) if index is None else pd.Index(index)
+    n = len(drawdown)
+
+    under = drawdown < 0
+    edges = np.diff(np.concatenate([[0], under.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)  # first row back at the peak, or n if still under water
+    if not len(starts):
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+    # Trough of each run: sort the under-water rows by (run, drawdown) and take each run's first
+    rows = np.flatnonzero(under)
+    run = np.repeat(np.arange(len(starts)), ends - starts)
+    order = np.lexsort((drawdown[rows], run))
+    troughs = rows[order[np.concatenate([[0], np.cumsum(ends - starts)[:-1]])]]
+
+    peaks = np.maximum(starts - 1, 0)
+    depth = drawdown[troughs]
+    recovered = ends < n
+    last = np.where(recovered, ends, n - 1)
+
+    top = np.argsort(depth, kind="stable")[:top_n]
+    recovery = pd.Series(index[np.minimum(ends, n - 1)]).where(recovered)
+    return pd.DataFrame({
+        "Peak": index[peaks[top]],
+        "Trough": index[troughs[top]],
+        "Recovery": recovery.to_numpy()[top],
+        "Depth": depth[top],
+        "Decline Days": troughs[top] - peaks[top],
+        "Recovery Days": np.where(recovered, ends - troughs, last - troughs)[top],
+        "Total Days": (last - peaks)[top],
+    })
+
+
+class DrawdownReport:
+    """
+    Drawdown analytics for every column of a returns matrix at once: wealth curves,
+    underwater curves and max drawdown, plus episode tables and rolling max drawdown on
+    demand. Usable on any DataFrame of simple returns, inside or outside the app.
+    """
+
+    def __init__(self, series, index, wealth, drawdown):
+        self.series = list(series)
+        self.index = index
+        self.wealth = wealth
+        self.drawdown = drawdown
+        self.max_drawdown = pd.Series(drawdown.min(axis=0) if len(drawdown) else np.nan, index=self.series)
+        self._rolling = {}
+
+    @classmethod
+    def compute(cls, returns):
+        """returns: DataFrame (rows = days, columns = series) of simple returns without missing values."""
+        wealth = wealth_curves(returns.to_numpy(dtype=float))
+        return cls(returns.columns, returns.index, wealth, underwater(wealth))
+
+    def underwater_frame(self):
+        return pd.DataFrame(self.drawdown, index=self.index, columns=self.series)
+
+    def episodes(self, series, top_n=TOP_EPISODES):
+        return episodes(self.drawdown[:, self.series.index(series)], self.index, top_n)
+
+    def rolling_max_drawdown(self, window):
+        if window not in self._rolling:
+            self._rolling[window] = pd.DataFrame(rolling_max_drawdown(self.wealth, window), index=self.index, columns=self.series)
+        return self._rolling[window]
+
+
+def drawdown_report(returns):
+    """DrawdownReport for a DataFrame of daily returns (one column per series)."""
+    return DrawdownReport.compute(returns)
+
+
+_report_cache = FingerprintCache(max_entries=8)
+
+
+def get_drawdown_report(returns):
+    """drawdown_report memoized on the content of the returns matrix."""
+    return _report_cache.get_or_build(frame_fingerprint(returns, list(returns.columns)), lambda: DrawdownReport.compute(returns))
@@ -0,0 +1,161 @@
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from contracts import ContractArray, MONTH_CODE_TO_NUM
+from preset_catalog import get_preset_catalog
+from price_store import STORE_DIR
+
+EXPIRY_INDEX_PATH = os.path.join(STORE_DIR, "expiry_index.npz")
+EXPIRY_CALENDAR = "Financial_Markets_US"
+FIRST_YEAR = 2000
+YEARS_AHEAD = 10
+
+MONTH_CODES = "".join(MONTH_CODE_TO_NUM)
+
+
+def compute_month_expiries(first_year, last_year, calendar_name=EXPIRY_CALENDAR):
+    """
+    Expiry date for every contract month from Jan first_year to Dec last_year, as a
+    datetime64[D] array of length 12 * (last_year - first_year + 1).
+
+    Same rule as get_expiry_date: in the month before the contract month, take the last
+    business day on or before the 25th and go back three business days. All months are
+    resolved with one calendar schedule and a vectorized searchsorted.
+    """
+    import pandas_market_calendars as mcal
+
+    calendar = mcal.get_calendar(calendar_name)
+    sched = calendar.schedule(start_date=f"{first_year - 1}-12-01", end_date=f"{last_year}-12-28")
+    business_days = sched.index.values.astype("datetime64[D]")
+
+    contract_months = np.arange(
+        np.datetime64(f"{first_year}-01", "M"), np.datetime64(f"{last_year + 1}-01", "M")
+    )
+    expiry_months = contract_months - np.timedelta64(1, "M")
+    day_after_25th = expiry_months.astype("datetime64[D]") + np.timedelta64(25, "D")
+    last_bday_pos = np.searchsorted(business_days, day_after_25th, side="left") - 1
+    return business_days[last_bday_pos - 3]
+
+
+def contract_keys(roots, first_year, last_year):
+    """All root x month x year symbols, e.g. '/GCLK25', in (root, year, month) order."""
+    years = np.arange(first_year, last_year + 1)
+    suffixes = np.array([f"{code}{year % 100:02d}" for year in years for code in MONTH_CODES])
+    return np.char.add(np.repeat(np.asarray(roots, dtype=str), len(suffixes)), np.tile(suffixes, len(roots)))
+
+
+class ExpiryIndex:
+    """
+    Array-backed expiry lookup table.
+
+    Holds a sorted array of contract symbols (every root x month x year in the universe)
+    with their expiry dates, plus the per-month table they were built from so contracts
+    outside the universe can still be answered. Queries take arrays and are vectorized.
+    """
+
+    def __init__(self, keys, expiries, month_expiries, first_year):
+        order = np.argsort(keys)
+        self.keys = np.asarray(keys)[order]
+        self.expiries = np.asarray(expiries, dtype="datetime64[D]")[order]
+        self.month_expiries = np.asarray(month_expiries, dtype="datetime64[D]")
+        self.first_year = int(first_year)
+
+    @property
+    def last_year(self):
+        return self.first_year + len(self.month_expiries) // 12 - 1
+
+    @classmethod
+    def build(cls, roots, first_year=FIRST_YEAR, last_year=None):
+        last_year = last_year or datetime.now().year + YEARS_AHEAD
+        month_expiries = compute_month_expiries(first_year, last_year)
+        keys = contract_keys(sorted(set(roots)), first_year, last_year)
+        expiries = np.tile(month_expiries, len(keys) // len(month_expiries)) if len(keys) else month_expiries[:0]
+        return cls(keys, expiries, month_expiries, first_year)
+
+    def save(self, path=EXPIRY_INDEX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, keys=self.keys, expiries=self.expiries,
+                                month_expiries=self.month_expiries, first_year=self.first_year)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=EXPIRY_INDEX_PATH):
+        with np.load(path) as npz:
+            return cls(npz["keys"], npz["expiries"], npz["month_expiries"], int(npz["first_year"]))
+
+    def expiry_dates(self, symbols):
+        """datetime64[D] expiry for each symbol (NaT where it can't be determined)."""
+        symbols = np.atleast_1d(np.asarray(symbols, dtype=str))
+        result = np.full(len(symbols), np.datetime64("NaT"), dtype="datetime64[D]")
+        if len(self.keys):
+            pos = np.clip(np.searchsorted(self.keys, symbols), 0, len(self.keys) - 1)
+            found = self.keys[pos] == symbols
+            result[found] = self.expiries[pos[found]]
+        else:
+            found = np.zeros(len(symbols), dtype=bool)
+
+        # Contracts outside the universe: fall back to the per-month table
+        if not found.all():
+            contracts = ContractArray.from_symbols(symbols[~found])
+            year, month = contracts.years, contracts.months
+            slot = (year - self.first_year) * 12 + month - 1
+            valid = (month > 0) & (slot >= 0) & (slot < len(self.month_expiries))
+            fallback = np.full(len(slot), np.datetime64("NaT"), dtype="datetime64[D]")
+            fallback[valid] = self.month_expiries[slot[valid]]
+            result[~found] = fallback
+        return result
+
+    def expired_before(self, symbols, date):
+        """Boolean array: which contracts expired strictly before date."""
+        return self.expiry_dates(symbols) < np.datetime64(pd.Timestamp(date).date(), "D")
+
+    def expiry_date(self, symbol):
+        """Expiry of one contract as a datetime.date, or None."""
+        value = self.expiry_dates([symbol])[0]
+        return None if np.isnat(value) else value.astype(object)
+
+
+_expiry_index = None
+_expiry_index_lock = threading.Lock()
+
+
+def universe_roots():
+    """Roots in the commodity catalog and in the presets."""
+    from create_marketview_options import get_available_commodities
+
+    contracts = ContractArray.from_symbols(list(get_available_commodities()))
+    roots = set(contracts.roots[contracts.valid])
+    try:
+        roots.update(ticker for preset in get_preset_catalog() for ticker in preset["tickers"])
+    except Exception as e:
+        print(f"Could not read preset roots for the expiry index: {e}")
+    return sorted(roots)
+
+
+def get_expiry_index(path=EXPIRY_INDEX_PATH):
+    """Process-wide ExpiryIndex, loaded from disk or built once and persisted."""
+    global _expiry_index
+    with _expiry_index_lock:
+        if _expiry_index is None:
+            index = None
+            if os.path.exists(path):
+                try:
+                    index = ExpiryIndex.load(path)
+                    if index.last_year < datetime.now().year + 1:
+                        index = None  # built too long ago, rebuild with a fresh horizon
+                except Exception as e:
+                    print(f"Error loading expiry index: {e}")
+            if index is None:
+                index = ExpiryIndex.build(universe_roots())
+                try:
+                    index.save(path)
+                except Exception as e:
+                    print(f"Error saving expiry index: {e}")
+            _expiry_index = index
+        return _expiry_index
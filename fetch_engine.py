@@ -0,0 +1,158 @@
+import heapq
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Defaults tuned to what the MV server tolerates, override via environment
+DEFAULT_MAX_WORKERS = int(os.getenv("MV_MAX_WORKERS", "4"))
+DEFAULT_RATE_LIMIT = float(os.getenv("MV_RATE_LIMIT", "5"))  # requests per second
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        """Take a token if available. Returns 0 on success, else seconds until one is available."""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Block until a token is available."""
+        while True:
+            delay = self.try_acquire()
+            if delay == 0:
+                return
+            time.sleep(delay)
+
+
+_shared_bucket = None
+_shared_bucket_lock = threading.Lock()
+
+
+def shared_rate_limiter():
+    """Process-wide token bucket, so concurrent engines together stay under DEFAULT_RATE_LIMIT."""
+    global _shared_bucket
+    with _shared_bucket_lock:
+        if _shared_bucket is None:
+            _shared_bucket = TokenBucket(DEFAULT_RATE_LIMIT)
+        return _shared_bucket
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _shared_executor(max_workers):
+    """
+    Long-lived worker pools, so worker threads (and their per-thread MV connections)
+    survive between runs.
+    """
+    with _executors_lock:
+        if max_workers not in _executors:
+            _executors[max_workers] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mv-fetch")
+        return _executors[max_workers]
+
+
+class FetchEngine:
+    """
+    Concurrent, rate-limited fetcher.
+
+    Runs fetch_fn(item) for every item on a worker pool. Each request first takes a token
+    from a TokenBucket (by default the one shared by all engines). Failed requests are rescheduled with exponential backoff and
+    jitter; while one item waits for its retry the workers keep serving the others.
+    """
+
+    def __init__(self, fetch_fn, max_workers=DEFAULT_MAX_WORKERS, rate_limit=None, burst=None,
+                 max_attempts=3, base_delay=1.0, max_delay=30.0, jitter=0.5, rate_limiter=None):
+        self.fetch_fn = fetch_fn
+        self.max_workers = max(1, int(max_workers))
+        if rate_limiter is None:
+            # Without an explicit limit, share the process-wide bucket with every other engine
+            rate_limiter = TokenBucket(rate_limit, burst) if rate_limit is not None else shared_rate_limiter()
+        self.rate_limiter = rate_limiter
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def backoff(self, attempt):
+        """Delay before retry number `attempt` (1-based): exponential, capped, with jitter."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def run(self, items, on_progress=None):
+        """
+        Fetch all items. Returns (results, errors): dicts keyed by item holding the fetched
+        value or the last exception raised. on_progress(done, total, item, ok) is called from
+        the calling thread as each item finishes, so it can safely update Streamlit widgets.
+        """
+        items = list(dict.fromkeys(items))
+        total = len(items)
+        results, errors = {}, {}
+        if not total:
+            return results, errors
+
+        executor = _shared_executor(self.max_workers)
+        pending = [(0.0, seq, item, 1) for seq, item in enumerate(items)]
+        heapq.heapify(pending)
+        seq = total
+        in_flight = {}
+
+        while pending or in_flight:
+            now = time.monotonic()
+            timeout = None
+
+            # Launch every item that is due, as long as a worker and a token are free
+            while pending and len(in_flight) < self.max_workers:
+                ready_at, _, item, attempt = pending[0]
+                if ready_at > now:
+                    timeout = ready_at - now
+                    break
+                token_wait = self.rate_limiter.try_acquire()
+                if token_wait:
+                    timeout = token_wait
+                    break
+                heapq.heappop(pending)
+                in_flight[executor.submit(self.fetch_fn, item)] = (item, attempt)
+
+            if not in_flight:
+                time.sleep(timeout or 0)
+                continue
+
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                item, attempt = in_flight.pop(future)
+                try:
+                    results[item] = future.result()
+                except Exception as e:
+                    print(f" Error on attempt {attempt} for {item}: {e}")
+                    if attempt < self.max_attempts:
+                        heapq.heappush(pending, (time.monotonic() + self.backoff(attempt), seq, item, attempt + 1))
+                        seq += 1
+                        continue
+                    errors[item] = e
+                if on_progress is not None:
+                    on_progress(len(results) + len(errors), total, item, item in results)
+
+        return results, errors
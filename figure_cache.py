@@ -0,0 +1,49 @@
+"""
+Rendered-figure cache shared by every tab.
+
+Charts are stored serialized (PNG bytes for matplotlib, figure JSON for plotly) under a
+fingerprint of the data they draw plus their render arguments, so a rerun that leaves a
+chart's inputs unchanged serves it without building the figure again. Entries are evicted
+least-recently-used once their total size passes FIGURE_CACHE_BYTES
+(SPARTAN_FIGURE_CACHE_MB, default 64).
+"""
+import io
+import json
+import os
+
+import streamlit as st
+
+from fingerprint_cache import FingerprintCache, value_fingerprint
+
+FIGURE_CACHE_BYTES = int(os.environ.get("SPARTAN_FIGURE_CACHE_MB", 64)) * 2 ** 20
+PYPLOT_DPI = 200  # what st.pyplot renders at
+
+_figures = FingerprintCache(max_entries=512, max_bytes=FIGURE_CACHE_BYTES, sizeof=len)
+
+
+def figure_key(name, *parts):
+    """Cache key for one chart: its name plus everything it is drawn from (frames, arrays, parameters)."""
+    return name, value_fingerprint(*parts)
+
+
+def _png(draw):
+    import matplotlib.pyplot as plt
+
+    fig = draw()
+    image = io.BytesIO()
+    try:
+        fig.savefig(image, format="png", dpi=PYPLOT_DPI, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return image.getvalue()
+
+
+def cached_pyplot(key, draw):
+    """st.pyplot for the matplotlib figure returned by draw(), which only runs on a cache miss."""
+    st.image(_figures.get_or_build(("pyplot", key), lambda: _png(draw)), use_container_width=True)
+
+
+def cached_plotly_chart(key, build, **kwargs):
+    """st.plotly_chart for the plotly figure returned by build(), which only runs on a cache miss."""
+    spec = _figures.get_or_build(("plotly", key), lambda: build().to_json())
+    st.plotly_chart(json.loads(spec), use_container_width=kwargs.pop("use_container_width", True), **kwargs)
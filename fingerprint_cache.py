@@ -0,0 +1,88 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def frame_fingerprint(df, columns):
+    """Cheap content hash of the given columns (shape, dtypes and raw bytes)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((len(df), list(columns))).encode())
+    for column in columns:
+        values = np.ascontiguousarray(df[column].to_numpy())
+        digest.update(str(values.dtype).encode())
+        digest.update(values.view(np.uint8) if values.dtype != object else repr(values.tolist()).encode())
+    return digest.hexdigest()
+
+
+def _feed(digest, part):
+    if isinstance(part, pd.DataFrame):
+        digest.update(repr(list(part.columns)).encode())
+        for position in range(part.shape[1]):
+            _feed(digest, part.iloc[:, position].to_numpy())
+        _feed(digest, part.index.to_numpy())
+    elif isinstance(part, pd.Series):
+        digest.update(repr(part.name).encode())
+        _feed(digest, part.to_numpy())
+        _feed(digest, part.index.to_numpy())
+    elif isinstance(part, (pd.Index, np.ndarray)):
+        values = np.ascontiguousarray(part)
+        digest.update(repr((values.dtype.str, values.shape)).encode())
+        digest.update(values.view(np.uint8) if values.dtype != object else repr(values.tolist()).encode())
+    else:
+        digest.update(repr(part).encode())
+
+
+def value_fingerprint(*parts):
+    """Content hash of any mix of DataFrames, Series, arrays and plain (repr-able) values."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _feed(digest, part)
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class FingerprintCache:
+    """
+    Small thread-safe LRU of derived results keyed on data fingerprints. Bounded by entry
+    count and, when max_bytes is set, by the total sizeof(value) of the entries.
+    """
+
+    def __init__(self, max_entries=8, max_bytes=None, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        """Cached value for key, or build() it and remember it (build runs outside the lock)."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = build()
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._sizes.pop(key, 0)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if size:
+                self._sizes[key] = size
+                self.total_bytes += size
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or
+                                              (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+                evicted, _ = self._entries.popitem(last=False)
+                self.total_bytes -= self._sizes.pop(evicted, 0)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.total_bytes = 0
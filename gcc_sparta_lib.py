@@ -1,9 +1,15 @@
-import win32com.client
-import pythoncom
 import pandas as pd
+import numpy as np
+from operator import attrgetter
+from pandas.tseries.api import guess_datetime_format
 from datetime import datetime
 import os
+import threading
 from dotenv import load_dotenv
+from price_store import get_price_store, missing_ranges, merge_bars, slice_bars, coverage_limit
+from mv_connection_pool import MVConnectionPool
+from fetch_engine import FetchEngine, DEFAULT_MAX_WORKERS
+from range_cache import RangeCache
 
 
 # Load environment variables from .env file
@@ -12,6 +18,10 @@ load_dotenv("credential.env")
 def connect_to_mv_com_server():
     """Establish connection to MV COM server using credentials from .env file."""
     try:
+        # Imported here so the rest of the module (and the fake connection) works off Windows
+        import win32com.client
+        import pythoncom
+
         # Fetch credentials from environment variables
         server = os.getenv("USERNAME_LOGIN")
         password = os.getenv("PASSWORD_LOGIN")
@@ -27,6 +37,28 @@ def connect_to_mv_com_server():
         print(f"Error connecting to MV COM server: {e}")
         return None
 
+
+_connection_pool = None
+_connection_pool_lock = threading.Lock()
+
+
+def get_connection_pool():
+    """
+    Process-wide MV connection pool shared by every fetch path.
+    One connection per thread (COM apartment safe). Set MV_FAKE_CONNECTION=1 to use the
+    pure-Python fake server instead of COM.
+    """
+    global _connection_pool
+    with _connection_pool_lock:
+        if _connection_pool is None:
+            factory = connect_to_mv_com_server
+            if os.getenv("MV_FAKE_CONNECTION") == "1":
+                from mv_fake import fake_connection_factory
+                factory = fake_connection_factory()
+            _connection_pool = MVConnectionPool(factory, thread_affinity=True)
+    return _connection_pool
+
+
 def fetch_daily_data(con, symbol: str, start_date: datetime, end_date: datetime):
     """Fetch daily data for the given symbol and date range."""
     try:
@@ -49,8 +81,8 @@ def inspect_com_object(obj):
                 print(f"{attr}: Could not retrieve ({e})")
 
 
-def daily_data_to_dataframe(daily_data):
-    """Converts list of daily COM data objects to a pandas DataFrame."""
+def _daily_data_to_dataframe_rowwise(daily_data):
+    """Record-by-record conversion, used when the columnar decode can't handle a batch."""
     data = []
     for day in daily_data:
         try:
@@ -68,14 +100,52 @@ def daily_data_to_dataframe(daily_data):
     return pd.DataFrame(data)
 
 
-def get_mv_data(symbol: str, start_date: datetime, end_date: datetime, inspect_first: bool = False):
-    """Safely retrieve and process MV daily data."""
-    con = connect_to_mv_com_server()
-    if con is None:
-        raise RuntimeError("Failed to connect to MV COM server.")
+BAR_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def parse_bar_dates(date_strings):
+    """Parse all bar date strings in one call, using the format of the first one."""
+    date_format = guess_datetime_format(date_strings[0]) if len(date_strings) and isinstance(date_strings[0], str) else None
+    if date_format is not None:
+        try:
+            return pd.to_datetime(date_strings, format=date_format)
+        except (ValueError, TypeError):
+            pass
+    return pd.to_datetime(date_strings, errors="coerce")
+
+
+def daily_data_to_dataframe(daily_data):
+    """
+    Converts list of daily COM data objects to a pandas DataFrame.
+    Each field is pulled straight into a preallocated typed array and all dates are parsed at once.
+    """
+    n = len(daily_data)
+    if n == 0:
+        return pd.DataFrame()
+    try:
+        columns = {"Date": parse_bar_dates(np.fromiter(map(attrgetter("StringDateTime"), daily_data), dtype=object, count=n))}
+        for field in BAR_FIELDS:
+            columns[field] = np.fromiter(map(attrgetter(field), daily_data), dtype=np.float64, count=n)
+    except (AttributeError, TypeError, ValueError):
+        # Missing or non-numeric fields in some records
+        return _daily_data_to_dataframe_rowwise(daily_data)
+    return pd.DataFrame(columns)
+
 
+def fetch_daily_frame(con, symbol: str, start_date: datetime, end_date: datetime):
+    """Fetch a date range as a DataFrame. Errors propagate so a failed range is never marked as stored."""
+    daily_data = list(con.GetDailyRange(symbol=symbol, From=start_date, to=end_date))
+    if not daily_data:
+        return pd.DataFrame()
+    return daily_data_to_dataframe(daily_data)
+
+
+def get_mv_data_remote(symbol: str, start_date: datetime, end_date: datetime, inspect_first: bool = False):
+    """Retrieve MV daily data straight from the server, bypassing the local price store."""
     try:
-        daily_data = fetch_daily_data(con, symbol, start_date, end_date)
+        daily_data = get_connection_pool().run(
+            lambda con: list(con.GetDailyRange(symbol=symbol, From=start_date, to=end_date))
+        )
     except Exception as e:
         raise RuntimeError(f"Failed to fetch data: {e}")
 
@@ -94,6 +164,91 @@ def get_mv_data(symbol: str, start_date: datetime, end_date: datetime, inspect_f
     except Exception as e:
         raise RuntimeError(f"Failed to convert daily data to DataFrame: {e}")
 
+
+def get_stored_range(symbol: str, start_date: datetime, end_date: datetime):
+    """
+    Bars for [start_date, end_date] from the local price store, fetching only the dates it
+    does not cover yet. Returns a possibly empty DataFrame; server errors raise RuntimeError.
+    """
+    store = get_price_store()
+    with store.lock(symbol):
+        stored, covered = store.read(symbol)
+        gaps = missing_ranges(covered, start_date, end_date)
+
+        if gaps:
+            def fetch_gaps(con):
+                return [fetch_daily_frame(con, symbol, gap_start.to_pydatetime(), gap_end.to_pydatetime())
+                        for gap_start, gap_end in gaps]
+
+            try:
+                fetched = get_connection_pool().run(fetch_gaps)
+            except Exception as e:
+                raise RuntimeError(f"Failed to fetch data: {e}")
+
+            stored = merge_bars([stored] + fetched)
+
+            # Only persist once the symbol is known to have data, so a transient
+            # empty response never gets recorded as "covered"
+            if not stored.empty:
+                new_start = min([gaps[0][0]] + ([covered[0]] if covered else []))
+                new_end = max([min(gaps[-1][1], coverage_limit())] + ([covered[1]] if covered else []))
+                if new_end >= new_start:
+                    try:
+                        store.write(symbol, stored, (new_start, new_end))
+                    except Exception as e:
+                        print(f"Error writing price store file for {symbol}: {e}")
+
+    return slice_bars(stored, start_date, end_date) if stored is not None else pd.DataFrame()
+
+
+_range_cache = RangeCache()
+
+
+def get_range_cache():
+    """Process-wide in-memory cache in front of the price store."""
+    return _range_cache
+
+
+def get_mv_data(symbol: str, start_date: datetime, end_date: datetime, inspect_first: bool = False, use_store: bool = True):
+    """
+    Safely retrieve and process MV daily data.
+    Served from the in-memory range cache, then the local price store; only dates
+    neither of them covers are fetched from the server.
+    """
+    if inspect_first or not use_store:
+        return get_mv_data_remote(symbol, start_date, end_date, inspect_first)
+
+    df = _range_cache.get(symbol, start_date, end_date, get_stored_range)
+    if df.empty:
+        raise ValueError("No data returned. This could be due to an invalid symbol or temporary server issue.")
+    return df
+
+def get_mv_data_many(symbols, start_date: datetime, end_date: datetime, as_dict: bool = False,
+                     max_workers: int = DEFAULT_MAX_WORKERS, max_attempts: int = 3, retry_delay: float = 1.0,
+                     on_progress=None):
+    """
+    Retrieve MV daily data for many symbols in one batch.
+
+    Repeated symbols are fetched once. Symbols run concurrently through the shared FetchEngine
+    and connection pool. Failures never raise; they are reported per symbol.
+
+    Returns (data, errors) where data is one long-format DataFrame with a 'Symbol' column
+    (or a dict symbol -> DataFrame when as_dict=True) and errors maps symbol -> "ErrorType: details".
+    """
+    unique_symbols = list(dict.fromkeys(symbols))
+    engine = FetchEngine(lambda symbol: get_mv_data(symbol, start_date, end_date),
+                         max_workers=max_workers, max_attempts=max_attempts, base_delay=retry_delay)
+    results, failures = engine.run(unique_symbols, on_progress=on_progress)
+    errors = {symbol: f"{type(e).__name__}: {e}" for symbol, e in failures.items()}
+
+    frames = {symbol: results[symbol] for symbol in unique_symbols if symbol in results}
+    if as_dict:
+        return frames, errors
+    if not frames:
+        return pd.DataFrame(columns=["Symbol", "Date"] + list(BAR_FIELDS)), errors
+    long_df = pd.concat(frames, names=["Symbol", None]).reset_index(level="Symbol").reset_index(drop=True)
+    return long_df, errors
+
 def test_auth_data_pull():
     """Test pulling data for \GCL over a short time range."""
     symbol = r"/GCL"  # raw string to handle backslash
@@ -0,0 +1,34 @@
+import importlib
+
+import streamlit as st
+
+
+def deferred(module_name, function_name):
+    """
+    Stand-in for module_name.function_name that imports the module on first call,
+    so a tab's plotting and analytics libraries only load when the tab renders.
+    """
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module_name), function_name)(*args, **kwargs)
+    return call
+
+
+def render_tabs(tab_renderers, lazy=True, key="active_tab"):
+    """
+    Render a dict of {tab label: render function}.
+
+    Eager mode uses st.tabs, which runs every render function on every rerun.
+    Lazy mode shows a tab selector and only runs the render function of the tab the
+    user activated; the tabs' data loaders are st.cache_data-backed, so switching back
+    to a tab with the same configuration is served from cache.
+    """
+    labels = list(tab_renderers)
+    if not lazy:
+        for tab, label in zip(st.tabs(labels), labels):
+            with tab:
+                tab_renderers[label]()
+        return
+
+    active = st.radio("Analysis", labels, horizontal=True, key=key, label_visibility="collapsed")
+    with st.container():
+        tab_renderers[active]()
@@ -0,0 +1,226 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class MVConnectionError(ConnectionError):
+    """The MV COM server could not be reached or a connection could not be made."""
+
+
+try:
+    from pywintypes import com_error
+except ImportError:  # off Windows only the fake server is available
+    CONNECTION_ERRORS = (ConnectionError,)
+else:
+    CONNECTION_ERRORS = (ConnectionError, com_error)
+
+
+def _default_health_check(con):
+    """A connection is healthy unless it reports IsConnected == False."""
+    try:
+        return bool(getattr(con, "IsConnected", True))
+    except Exception:
+        return False
+
+
+def _close_connection(con):
+    """Best-effort disconnect, errors are ignored."""
+    try:
+        disconnect = getattr(con, "Disconnect", None)
+        if callable(disconnect):
+            disconnect()
+    except Exception:
+        pass
+
+
+class _PooledConnection:
+    __slots__ = ("con", "created_at", "last_used", "owner")
+
+    def __init__(self, con, now, owner=None):
+        self.con = con
+        self.created_at = now
+        self.last_used = now
+        self.owner = owner
+
+
+class MVConnectionPool:
+    """
+    Reusable MV COM server connections shared by all fetch paths.
+
+    thread_affinity=True keeps one connection per thread, created on that thread, which is
+    what COM apartments require. thread_affinity=False hands out up to max_size connections
+    from a shared idle list. In both modes connections are health-checked before reuse,
+    evicted after idle_timeout seconds and re-created automatically when they fail.
+    """
+
+    def __init__(self, factory, max_size=4, idle_timeout=300.0, health_check=_default_health_check,
+                 thread_affinity=True, acquire_timeout=60.0, clock=time.monotonic,
+                 connection_errors=CONNECTION_ERRORS):
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self.thread_affinity = thread_affinity
+        self.acquire_timeout = acquire_timeout
+        self.clock = clock
+        self.connection_errors = connection_errors
+
+        self._lock = threading.Lock()
+        self._idle = []
+        self._in_use = 0
+        self._slot_freed = threading.Condition(self._lock)
+        self._per_thread = {}
+        self.stats = {"created": 0, "reused": 0, "evicted": 0, "discarded": 0}
+
+    # -- connection lifecycle -------------------------------------------------
+
+    def _create(self, owner=None):
+        con = self.factory()
+        if con is None:
+            raise MVConnectionError("Failed to connect to MV COM server.")
+        with self._lock:
+            self.stats["created"] += 1
+        return _PooledConnection(con, self.clock(), owner)
+
+    def _usable(self, entry, now):
+        if self.idle_timeout is not None and now - entry.last_used > self.idle_timeout:
+            return False
+        return self.health_check(entry.con)
+
+    def _evict(self, entry, stat="evicted"):
+        _close_connection(entry.con)
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _acquire_thread_local(self):
+        owner = threading.get_ident()
+        self._drop_dead_threads()
+        with self._lock:
+            entry = self._per_thread.pop(owner, None)
+        if entry is not None:
+            if self._usable(entry, self.clock()):
+                with self._lock:
+                    self.stats["reused"] += 1
+                return entry
+            self._evict(entry)
+        return self._create(owner)
+
+    def _acquire_shared(self):
+        deadline = self.clock() + self.acquire_timeout
+        stale = []
+        with self._lock:
+            while True:
+                now = self.clock()
+                entry = None
+                while self._idle and entry is None:
+                    candidate = self._idle.pop()
+                    if self.idle_timeout is not None and now - candidate.last_used > self.idle_timeout:
+                        stale.append(candidate)
+                    else:
+                        entry = candidate
+                if entry is not None or self._in_use < self.max_size:
+                    self._in_use += 1
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a free MV connection.")
+                self._slot_freed.wait(remaining)
+        for old in stale:
+            self._evict(old)
+
+        if entry is not None:
+            if self.health_check(entry.con):
+                with self._lock:
+                    self.stats["reused"] += 1
+                return entry
+            self._evict(entry)
+        try:
+            return self._create()
+        except Exception:
+            self._release_slot()
+            raise
+
+    def _release_slot(self):
+        with self._lock:
+            self._in_use -= 1
+            self._slot_freed.notify()
+
+    def _drop_dead_threads(self):
+        """Close and forget connections owned by threads that have exited."""
+        alive = {t.ident for t in threading.enumerate()}
+        with self._lock:
+            dead = [self._per_thread.pop(owner) for owner in list(self._per_thread) if owner not in alive]
+        for entry in dead:
+            self._evict(entry)
+
+    # -- public API -----------------------------------------------------------
+
+    def acquire(self):
+        """Check out a healthy connection entry; pair with release() or discard()."""
+        if self.thread_affinity:
+            return self._acquire_thread_local()
+        return self._acquire_shared()
+
+    def release(self, entry):
+        """Return a connection entry to the pool after successful use."""
+        entry.last_used = self.clock()
+        if self.thread_affinity:
+            with self._lock:
+                self._per_thread[entry.owner] = entry
+            return
+        with self._lock:
+            self._idle.append(entry)
+        self._release_slot()
+
+    def discard(self, entry):
+        """Drop a connection that failed so the next acquire reconnects."""
+        self._evict(entry, "discarded")
+        if not self.thread_affinity:
+            self._release_slot()
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a raw connection; it is discarded if the body raises a connection error."""
+        entry = self.acquire()
+        try:
+            yield entry.con
+        except self.connection_errors:
+            self.discard(entry)
+            raise
+        except BaseException:
+            self.release(entry)
+            raise
+        else:
+            self.release(entry)
+
+    def run(self, func, reconnect_attempts=1):
+        """
+        Call func(con), reconnecting and retrying after a connection error up to
+        reconnect_attempts times. Any other exception is raised immediately.
+        """
+        for attempt in range(reconnect_attempts + 1):
+            try:
+                with self.connection() as con:
+                    return func(con)
+            except self.connection_errors:
+                if attempt == reconnect_attempts:
+                    raise
+
+    def evict_idle(self):
+        """Close idle shared connections past idle_timeout; returns how many were closed."""
+        now = self.clock()
+        with self._lock:
+            stale = [e for e in self._idle if self.idle_timeout is not None and now - e.last_used > self.idle_timeout]
+            self._idle = [e for e in self._idle if e not in stale]
+        for entry in stale:
+            self._evict(entry)
+        return len(stale)
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._lock:
+            entries = self._idle + list(self._per_thread.values())
+            self._idle = []
+            self._per_thread = {}
+        for entry in entries:
+            _close_connection(entry.con)
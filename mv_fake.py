@@ -0,0 +1,87 @@
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+
+class FakeBar:
+    """Stand-in for an MV daily bar COM record."""
+
+    __slots__ = ("StringDateTime", "Open", "High", "Low", "Close", "Volume")
+
+    def __init__(self, day, open_, high, low, close, volume):
+        self.StringDateTime = day.strftime("%m/%d/%Y")
+        self.Open = open_
+        self.High = high
+        self.Low = low
+        self.Close = close
+        self.Volume = volume
+
+
+def make_fake_bars(symbol, start_date, end_date):
+    """Deterministic random-walk weekday bars for a symbol, seeded by its name."""
+    rng = random.Random(zlib.crc32(symbol.encode()))
+    price = 50 + rng.random() * 50
+    bars = []
+    day = datetime(start_date.year, start_date.month, start_date.day)
+    # Walk from a fixed origin so overlapping ranges return identical prices
+    origin = datetime(2000, 1, 3)
+    for _ in range(max(0, (day - origin).days)):
+        price = max(1.0, price + rng.gauss(0, 0.5))
+    while day <= end_date:
+        step = rng.gauss(0, 0.5)
+        if day.weekday() < 5:
+            open_ = price
+            price = max(1.0, price + step)
+            bars.append(FakeBar(day, open_, max(open_, price) + 0.2, min(open_, price) - 0.2, price,
+                                1_000 + int(abs(step) * 10_000)))
+        else:
+            price = max(1.0, price + step)
+        day += timedelta(days=1)
+    return bars
+
+
+class FakeMVConnection:
+    """
+    Pure-Python replacement for Mv.Connectivity.ComClient.ServerConnection,
+    used to test and benchmark the fetch paths without Windows or COM.
+    """
+
+    instances = 0
+    _instances_lock = threading.Lock()
+
+    def __init__(self, connect_latency=0.0, request_latency=0.0, failure_rate=0.0, seed=None):
+        self.connect_latency = connect_latency
+        self.request_latency = request_latency
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self.IsConnected = False
+        self.requests = 0
+        with FakeMVConnection._instances_lock:
+            FakeMVConnection.instances += 1
+
+    def Connect(self, server, password):
+        time.sleep(self.connect_latency)
+        self.IsConnected = True
+
+    def Disconnect(self):
+        self.IsConnected = False
+
+    def GetDailyRange(self, symbol, From, to):
+        if not self.IsConnected:
+            raise ConnectionError("Not connected to MV COM server.")
+        self.requests += 1
+        time.sleep(self.request_latency)
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise ConnectionError(f"Simulated server error for {symbol}.")
+        return make_fake_bars(symbol, From, to)
+
+
+def fake_connection_factory(connect_latency=0.0, request_latency=0.0, failure_rate=0.0):
+    """Return a factory with the same contract as connect_to_mv_com_server."""
+    def factory():
+        con = FakeMVConnection(connect_latency, request_latency, failure_rate)
+        con.Connect("fake", "fake")
+        return con
+    return factory
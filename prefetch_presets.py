@@ -0,0 +1,100 @@
+"""
+Warm the local price store with every contract the presets in PriceAnalyzerIn.csv need.
+
+Run before market open (after logging in once so credential.env exists):
+    python prefetch_presets.py
+    python prefetch_presets.py --workers 8 --dry-run
+
+Set SPARTAN_PREFETCH_ON_START=1 to also run it in a background thread when the app starts.
+"""
+import argparse
+import threading
+import time
+from datetime import datetime
+
+from create_marketview_options import preset_contract_symbol
+from data_engineering_tab5 import HISTORY_YEARS, check_instrument_expiry_month_only, generate_instrument_lists
+from data_engineering_tab5 import start_date as tab5_start_date
+from fetch_engine import DEFAULT_MAX_WORKERS
+from gcc_sparta_lib import get_mv_data_many
+from sidebar import load_presets_from_csv
+
+
+def preset_contracts(preset, today=None):
+    """
+    Contracts tabs 1, 5 and 6 load for a preset: the front contract of every leg (tab 1)
+    plus the same root and month over HISTORY_YEARS of history, the horizon tabs 5 and 6
+    request through generate_instrument_lists (not the preset's shorter yearsBack).
+    """
+    today = today or datetime.now()
+    front_contracts = [preset_contract_symbol(ticker, month, today)
+                       for ticker, month in zip(preset['tickers'], preset['months'])]
+    instrument_expiry_check = check_instrument_expiry_month_only(front_contracts)
+    _, history_contracts = generate_instrument_lists(instrument_expiry_check, years_back=HISTORY_YEARS)
+    return list(dict.fromkeys(front_contracts + history_contracts))
+
+
+def prefetch_window(today=None):
+    """One date window covering both the sidebar default range and tab 5's 15-year history."""
+    today = today or datetime.now()
+    start = min(tab5_start_date, datetime(today.year - 10, 1, 1))
+    end = datetime(today.year, 12, 31)
+    return start, end
+
+
+def prefetch_presets(presets=None, max_workers=DEFAULT_MAX_WORKERS, log=print):
+    """Pull every preset contract into the price store. Returns a summary dict with timings."""
+    t0 = time.perf_counter()
+    presets = load_presets_from_csv() if presets is None else presets
+    contracts = list(dict.fromkeys(c for preset in presets for c in preset_contracts(preset)))
+    start, end = prefetch_window()
+    log(f"Prefetching {len(contracts)} contracts from {len(presets)} presets ({start:%Y-%m-%d} to {end:%Y-%m-%d})")
+
+    def report(done, total, symbol, ok):
+        elapsed = time.perf_counter() - t0
+        log(f"[{done}/{total}] {symbol:<16} {'ok' if ok else 'FAILED'}  {elapsed:7.1f}s")
+
+    frames, errors = get_mv_data_many(contracts, start, end, as_dict=True, max_workers=max_workers, on_progress=report)
+    elapsed = time.perf_counter() - t0
+    summary = {
+        "contracts": len(contracts),
+        "fetched": len(frames),
+        "failed": errors,
+        "rows": sum(len(df) for df in frames.values()),
+        "seconds": round(elapsed, 2),
+    }
+    log(f"Done in {elapsed:.1f}s: {summary['fetched']}/{summary['contracts']} contracts, "
+        f"{summary['rows']} rows, {len(errors)} failed")
+    for symbol, error in errors.items():
+        log(f"  {symbol}: {error}")
+    return summary
+
+
+def start_background_prefetch(max_workers=2):
+    """Run prefetch_presets in a daemon thread; returns the thread."""
+    thread = threading.Thread(
+        target=prefetch_presets,
+        kwargs={"max_workers": max_workers, "log": lambda msg: print(f"[prefetch] {msg}")},
+        name="preset-prefetch",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the local price store for all presets.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS, help="concurrent requests")
+    parser.add_argument("--dry-run", action="store_true", help="only list the contracts that would be fetched")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        presets = load_presets_from_csv()
+        for preset in presets:
+            print(f"{preset['description']} ({preset['months_code']}): {', '.join(preset_contracts(preset))}")
+        return
+    prefetch_presets(max_workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
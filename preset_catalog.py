@@ -0,0 +1,102 @@
+import ast
+import os
+import threading
+
+import pandas as pd
+
+PRESETS_CSV = "PriceAnalyzerIn.csv"
+
+LIST_COLUMNS = {
+    'tickers': 'tickerList',
+    'months': 'contractMonthsList',
+    'weights': 'weightsList',
+    'conversions': 'convList',
+}
+
+
+def parse_list(value):
+    """Safely parse a list column such as "['#BRGBM','#ICENBAM']" (no eval)."""
+    parsed = ast.literal_eval(value)
+    return list(parsed) if isinstance(parsed, (list, tuple)) else [parsed]
+
+
+class PresetCatalog:
+    """
+    Presets parsed once and indexed by group, region, month code and description,
+    so each sidebar filter is a dict lookup instead of a scan over every preset.
+    """
+
+    def __init__(self, presets):
+        self.presets = presets
+        self._regions = {}
+        self._month_codes = {}
+        self._descriptions = {}
+        self._by_key = {}
+
+        for preset in presets:
+            group, region, months_code = preset['group'], preset['region'], preset['months_code']
+            self._regions.setdefault(group, set()).add(region)
+            self._month_codes.setdefault((group, region), set()).add(months_code)
+            self._descriptions.setdefault((group, region, months_code), []).append(preset['description'])
+            # First preset wins for duplicate descriptions, as the old linear search did
+            self._by_key.setdefault((group, region, months_code, preset['description']), preset)
+
+        self._groups = sorted(self._regions)
+        self._regions = {group: sorted(regions) for group, regions in self._regions.items()}
+        self._month_codes = {key: sorted(codes) for key, codes in self._month_codes.items()}
+
+    @classmethod
+    def from_csv(cls, path=PRESETS_CSV):
+        df = pd.read_csv(path)
+        presets = []
+        for row in df.to_dict('records'):
+            preset = {'name': row['Name']}
+            for key, column in LIST_COLUMNS.items():
+                preset[key] = parse_list(row[column])
+            preset.update({
+                'description': row['desc'],
+                'group': row['group'],
+                'region': row['region'],
+                'months_code': ''.join(preset['months']),
+                'years_back': int(row['yearsBack']),
+            })
+            presets.append(preset)
+        return cls(presets)
+
+    def __len__(self):
+        return len(self.presets)
+
+    def __iter__(self):
+        return iter(self.presets)
+
+    def groups(self):
+        return self._groups
+
+    def regions(self, group):
+        return self._regions.get(group, [])
+
+    def month_codes(self, group, region):
+        return self._month_codes.get((group, region), [])
+
+    def descriptions(self, group, region, months_code):
+        return self._descriptions.get((group, region, months_code), [])
+
+    def find(self, group, region, months_code, description):
+        return self._by_key.get((group, region, months_code, description))
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_preset_catalog(path=PRESETS_CSV):
+    """Catalog for path, re-parsed only when the file's modification time changes."""
+    mtime = os.stat(path).st_mtime_ns
+    with _catalogs_lock:
+        cached = _catalogs.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    catalog = PresetCatalog.from_csv(path)
+    with _catalogs_lock:
+        _catalogs[path] = (mtime, catalog)
+    return catalog
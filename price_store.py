@@ -0,0 +1,137 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+# Local store location, override with SPARTAN_STORE_DIR
+STORE_DIR = os.getenv(
+    "SPARTAN_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "price_store"),
+)
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _to_day(value):
+    """Normalize a date/datetime/string to a midnight Timestamp."""
+    return pd.Timestamp(value).normalize()
+
+
+def _contract_root(symbol):
+    """Root used to partition the store, e.g. '/GCL' for '/GCLK25'."""
+    if len(symbol) >= 5 and symbol[-2:].isdigit() and symbol[-3].isalpha():
+        return symbol[:-3]
+    return symbol
+
+
+class PriceStore:
+    """
+    On-disk columnar store of daily bars, one compressed .npz file per contract,
+    partitioned by contract root. Each file also records the date interval that
+    has already been requested from the server, so only missing dates are fetched.
+    """
+
+    def __init__(self, root_dir=STORE_DIR):
+        self.root_dir = root_dir
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, symbol):
+        root = quote(_contract_root(symbol), safe="")
+        return os.path.join(self.root_dir, root, quote(symbol, safe="") + ".npz")
+
+    def lock(self, symbol):
+        """Per-symbol lock so concurrent readers/writers don't interleave."""
+        with self._locks_guard:
+            if symbol not in self._locks:
+                self._locks[symbol] = threading.Lock()
+            return self._locks[symbol]
+
+    def read(self, symbol):
+        """Return (DataFrame, (covered_start, covered_end)) or (None, None) if not stored."""
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None, None
+        try:
+            with np.load(path) as npz:
+                df = pd.DataFrame({"Date": pd.to_datetime(npz["Date"])})
+                for col in PRICE_COLUMNS:
+                    df[col] = npz[col]
+                covered = tuple(pd.Timestamp(d) for d in npz["covered"])
+            return df, covered
+        except Exception as e:
+            print(f"Error reading price store file for {symbol}: {e}")
+            return None, None
+
+    def write(self, symbol, df, covered):
+        """Atomically replace the stored file for a symbol."""
+        path = self._path(symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        arrays = {"Date": df["Date"].to_numpy(dtype="datetime64[ns]")}
+        for col in PRICE_COLUMNS:
+            arrays[col] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64")
+        arrays["covered"] = np.array([np.datetime64(c, "ns") for c in covered])
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def delete(self, symbol):
+        path = self._path(symbol)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def missing_ranges(covered, start_date, end_date):
+    """
+    Return the (start, end) day ranges that must be fetched to serve [start_date, end_date].
+    Gaps always touch the covered interval so the stored coverage stays contiguous.
+    """
+    start, end = _to_day(start_date), _to_day(end_date)
+    if start > end:
+        return []
+    if covered is None:
+        return [(start, end)]
+    covered_start, covered_end = covered
+    gaps = []
+    if start < covered_start:
+        gaps.append((start, covered_start - timedelta(days=1)))
+    if end > covered_end:
+        gaps.append((covered_end + timedelta(days=1), end))
+    return gaps
+
+
+def merge_bars(frames):
+    """Concatenate bar frames, keeping the latest copy of each date."""
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=["Date"] + PRICE_COLUMNS)
+    df = pd.concat(frames, ignore_index=True)
+    df = df.drop_duplicates(subset="Date", keep="last").sort_values("Date")
+    return df.reset_index(drop=True)
+
+
+def slice_bars(df, start_date, end_date):
+    """Rows of df whose Date falls on a day within [start_date, end_date]."""
+    start, end = _to_day(start_date), _to_day(end_date) + timedelta(days=1)
+    mask = (df["Date"] >= start) & (df["Date"] < end)
+    return df.loc[mask].reset_index(drop=True)
+
+
+def coverage_limit():
+    """Last day we treat as final; today's bar may still change, so it is always refetched."""
+    return _to_day(datetime.now()) - timedelta(days=1)
+
+
+_default_store = None
+
+
+def get_price_store():
+    """Process-wide PriceStore instance."""
+    global _default_store
+    if _default_store is None:
+        _default_store = PriceStore()
+    return _default_store
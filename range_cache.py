@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+import pandas as pd
+
+from price_store import merge_bars, slice_bars, coverage_limit
+
+ONE_DAY = timedelta(days=1)
+
+
+def _to_day(value):
+    return pd.Timestamp(value).normalize()
+
+
+def add_interval(intervals, start, end):
+    """Insert [start, end] into a sorted list of disjoint day intervals, merging overlaps and neighbours."""
+    merged = []
+    for s, e in sorted(intervals + [(start, end)]):
+        if merged and s <= merged[-1][1] + ONE_DAY:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+        else:
+            merged.append((s, e))
+    return merged
+
+
+def uncovered(intervals, start, end):
+    """Sub-ranges of [start, end] not covered by the sorted, disjoint intervals."""
+    gaps = []
+    cursor = start
+    for s, e in intervals:
+        if e < cursor:
+            continue
+        if s > end:
+            break
+        if s > cursor:
+            gaps.append((cursor, s - ONE_DAY))
+        cursor = max(cursor, e + ONE_DAY)
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def trim_intervals(intervals, last_day):
+    """Drop coverage after last_day."""
+    return [(s, min(e, last_day)) for s, e in intervals if s <= last_day]
+
+
+class _Entry:
+    __slots__ = ("frame", "intervals", "live_expires")
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.intervals = []
+        self.live_expires = 0.0
+
+
+class RangeCache:
+    """
+    In-memory bar cache keyed by symbol that remembers which date intervals it already holds.
+
+    Requests inside a covered interval are sliced from memory; otherwise only the uncovered gaps
+    are fetched. Coverage past yesterday (today's still-changing bar and future dates) is trusted
+    for live_ttl seconds before it is fetched again.
+    """
+
+    def __init__(self, max_symbols=500, live_ttl=300.0):
+        self.max_symbols = max_symbols
+        self.live_ttl = live_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._symbol_locks = {}
+
+    def _symbol_lock(self, symbol):
+        with self._lock:
+            if symbol not in self._symbol_locks:
+                self._symbol_locks[symbol] = threading.Lock()
+            return self._symbol_locks[symbol]
+
+    def _get_entry(self, symbol):
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None:
+                self._entries.move_to_end(symbol)
+            return entry
+
+    def _put_entry(self, symbol, entry):
+        with self._lock:
+            self._entries[symbol] = entry
+            self._entries.move_to_end(symbol)
+            while len(self._entries) > self.max_symbols:
+                evicted, _ = self._entries.popitem(last=False)
+                self._symbol_locks.pop(evicted, None)
+
+    def get(self, symbol, start_date, end_date, fetch_range):
+        """
+        Bars for symbol within [start_date, end_date]. fetch_range(symbol, start, end) must return
+        a (possibly empty) bar DataFrame and raise on failure.
+        """
+        start, end = _to_day(start_date), _to_day(end_date)
+        with self._symbol_lock(symbol):
+            entry = self._get_entry(symbol) or _Entry(None)
+            if time.monotonic() > entry.live_expires:
+                entry.intervals = trim_intervals(entry.intervals, coverage_limit())
+
+            gaps = uncovered(entry.intervals, start, end)
+            if gaps:
+                fetched = [fetch_range(symbol, gap_start, gap_end) for gap_start, gap_end in gaps]
+                entry.frame = merge_bars([entry.frame] + fetched)
+                # An empty symbol is not remembered, so a transient empty response is retried
+                if not entry.frame.empty:
+                    for gap_start, gap_end in gaps:
+                        entry.intervals = add_interval(entry.intervals, gap_start, gap_end)
+                    if gaps[-1][1] > coverage_limit():
+                        entry.live_expires = time.monotonic() + self.live_ttl
+                    self._put_entry(symbol, entry)
+
+            if entry.frame is None or entry.frame.empty:
+                return pd.DataFrame()
+            return slice_bars(entry.frame, start, end)
+
+    def covered_intervals(self, symbol):
+        entry = self._get_entry(symbol)
+        return list(entry.intervals) if entry is not None else []
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._symbol_locks.clear()
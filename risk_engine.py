@@ -0,0 +1,204 @@
+from bisect import bisect_left, bisect_right
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from fingerprint_cache import FingerprintCache, frame_fingerprint
+
+# Confidence levels (%) the sidebar slider offers
+CONFIDENCE_LEVELS = np.arange(90, 100)
+TRADING_DAYS = 252
+
+RISK_METRICS = {
+    "historical_var": "Historical VaR",
+    "parametric_var": "Parametric VaR",
+    "cornish_fisher_var": "Cornish-Fisher VaR",
+    "expected_shortfall": "Expected Shortfall",
+    "parametric_es": "Parametric ES",
+}
+
+
+def returns_matrix(merged_data, group_A_name, group_B_name, constituents=()):
+    """
+    Daily returns of Group A, Group B, the spread and any constituent price columns,
+    one column per series, keeping rows where every series has a finite return.
+    """
+    returns = pd.DataFrame({
+        group_A_name: merged_data["Return_A"],
+        group_B_name: merged_data["Return_B"],
+        "Spread": merged_data["Return_Spread"],
+    })
+    for column in constituents:
+        if column in merged_data.columns and column not in returns.columns:
+            returns[column] = merged_data[column].pct_change()
+    return returns[np.isfinite(returns.to_numpy(dtype=float)).all(axis=1)]
+
+
+class RiskReport:
+    """
+    VaR / ES for every series and confidence level. Each metric is a
+    (len(confidences), n_series) array of daily returns (negative = loss);
+    volatility is annualized, per series.
+    """
+
+    def __init__(self, series, confidences, metrics, volatility, observations):
+        self.series = list(series)
+        self.confidences = np.asarray(confidences)
+        self.metrics = metrics
+        self.volatility = volatility
+        self.observations = observations
+
+    @classmethod
+    def compute(cls, returns, confidences=CONFIDENCE_LEVELS):
+        """returns: DataFrame (rows = days, columns = series) without missing values."""
+        x = returns.to_numpy(dtype=float)
+        confidences = np.asarray(confidences, dtype=float)
+        alpha = (100 - confidences) / 100  # tail probability per confidence level
+        n = len(x)
+
+        historical_var = np.percentile(x, alpha * 100, axis=0)
+        in_tail = x[None, :, :] <= historical_var[:, None, :]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            expected_shortfall = np.where(in_tail, x[None], 0.0).sum(axis=1) / in_tail.sum(axis=1)
+
+        mean = x.mean(axis=0)
+        std = x.std(axis=0, ddof=1)
+        centred = x - mean
+        m2 = (centred ** 2).mean(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            skew = (centred ** 3).mean(axis=0) / m2 ** 1.5
+            excess_kurtosis = (centred ** 4).mean(axis=0) / m2 ** 2 - 3
+
+        normal = NormalDist()
+        z = np.array([normal.inv_cdf(a) for a in alpha])[:, None]
+        pdf_z = np.array([normal.pdf(v) for v in z.ravel()])[:, None]
+        z_cf = (z
+                + (z ** 2 - 1) * skew / 6
+                + (z ** 3 - 3 * z) * excess_kurtosis / 24
+                - (2 * z ** 3 - 5 * z) * skew ** 2 / 36)
+
+        metrics = {
+            "historical_var": historical_var,
+            "parametric_var": mean + z * std,
+            "cornish_fisher_var": mean + z_cf * std,
+            "expected_shortfall": expected_shortfall,
+            "parametric_es": mean - std * pdf_z / alpha[:, None],
+        }
+        return cls(returns.columns, confidences, metrics, std * np.sqrt(TRADING_DAYS), n)
+
+    def _row(self, confidence):
+        matches = np.flatnonzero(self.confidences == confidence)
+        if not len(matches):
+            raise KeyError(f"Confidence {confidence} not computed (have {self.confidences.tolist()})")
+        return matches[0]
+
+    def lookup(self, metric, confidence):
+        """One metric at one confidence level, as a Series over the series names."""
+        return pd.Series(self.metrics[metric][self._row(confidence)], index=self.series)
+
+    def table(self, confidence, percent=True):
+        """Every metric plus annualized volatility at one confidence level (rows = series)."""
+        scale = 100 if percent else 1
+        row = self._row(confidence)
+        table = pd.DataFrame({label: self.metrics[key][row] * scale for key, label in RISK_METRICS.items()}, index=self.series)
+        table["Volatility (ann.)"] = self.volatility * scale
+        return table
+
+
+class SortedWindow:
+    """
+    The last `window` values in sorted order, tracking the `q` quantile and the sum of the
+    values at or below it.
+
+    Each push binary-searches the insert and delete positions (O(log w) comparisons) and
+    shifts the list once for each (an O(w) memmove in C, about 10 KB at w = 1260). The sum of
+    the lowest k + 1 values (k = the quantile's lower index) is updated in O(1) whenever a
+    value enters or leaves below index k, so VaR and ES cost no Python-level work per window
+    element. The sum is recomputed once per full turnover of the window to stop rounding drift.
+    A full pass is O(n log w) comparisons plus O(n w) memory moves.
+    """
+
+    def __init__(self, window, q):
+        self.window = window
+        self.values = []
+        self._arrivals = []
+        self._oldest = 0
+        self._position = q * (window - 1)
+        self._k = int(self._position)
+        self._tail_sum = None  # sum of values[:k + 1] once the window is full
+        self._since_resync = 0
+
+    def push(self, value):
+        values, k = self.values, self._k
+        self._arrivals.append(value)
+        at = bisect_right(values, value)
+        values.insert(at, value)
+        if self._tail_sum is not None and at <= k:
+            self._tail_sum += value - values[k + 1]  # values[k + 1] was pushed out of the tail
+
+        if len(values) > self.window:
+            expired = self._arrivals[self._oldest]
+            self._oldest += 1
+            at = bisect_left(values, expired)
+            if at <= k:
+                self._tail_sum += values[k + 1] - expired  # values[k + 1] moves into the tail
+            del values[at]
+            if self._oldest > self.window:
+                del self._arrivals[:self._oldest]
+                self._oldest = 0
+
+        if len(values) == self.window:
+            self._since_resync += 1
+            if self._tail_sum is None or self._since_resync >= self.window:
+                self._tail_sum = sum(values[:k + 1])
+                self._since_resync = 0
+
+    def full(self):
+        return len(self.values) == self.window
+
+    def quantile(self):
+        """Linear-interpolated q quantile of a full window, as np.percentile(window, q * 100)."""
+        lo = self._k
+        hi = min(lo + 1, self.window - 1)
+        return self.values[lo] + (self._position - lo) * (self.values[hi] - self.values[lo])
+
+    def tail_mean(self, threshold):
+        """Mean of the values at or below threshold, for a threshold in [values[k], values[k + 1]]."""
+        # Beyond index k only ties with the threshold itself can still be <= threshold
+        count = bisect_right(self.values, threshold)
+        return (self._tail_sum + (count - self._k - 1) * threshold) / count
+
+
+def rolling_var_es(returns, window, confidence):
+    """
+    Rolling historical VaR and expected shortfall of one return series (negative = loss).
+    Returns a DataFrame with VaR and ES columns on the input index, NaN until the first full window.
+    """
+    alpha = (100 - confidence) / 100
+    values = np.asarray(returns, dtype=float)
+    var = np.full(len(values), np.nan)
+    es = np.full(len(values), np.nan)
+    sorted_window = SortedWindow(window, alpha)
+    for i, value in enumerate(values.tolist()):
+        sorted_window.push(value)
+        if sorted_window.full():
+            var[i] = sorted_window.quantile()
+            es[i] = sorted_window.tail_mean(var[i])
+    return pd.DataFrame({"VaR": var, "ES": es}, index=getattr(returns, "index", None))
+
+
+_report_cache = FingerprintCache(max_entries=8)
+_rolling_cache = FingerprintCache(max_entries=32)
+
+
+def get_risk_report(returns, confidences=CONFIDENCE_LEVELS):
+    """RiskReport for a returns matrix, memoized on its content so slider moves are lookups."""
+    key = (frame_fingerprint(returns, list(returns.columns)), tuple(np.asarray(confidences).tolist()))
+    return _report_cache.get_or_build(key, lambda: RiskReport.compute(returns, confidences))
+
+
+def get_rolling_var_es(returns, column, window, confidence):
+    """rolling_var_es for one column of a returns matrix, memoized per data, window and confidence."""
+    key = (frame_fingerprint(returns, [column]), window, confidence)
+    return _rolling_cache.get_or_build(key, lambda: rolling_var_es(returns[column], window, confidence))
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from fingerprint_cache import FingerprintCache, frame_fingerprint
+
+# Window sizes the sidebar slider offers
+ROLLING_WINDOWS = range(5, 101)
+STAT_COLUMNS = ["RollingMean_A", "RollingMean_B", "RollingStd_A", "RollingStd_B", "Rolling_Covariance", "Rolling_Correlation"]
+
+
+def window_sums(cumulative, windows):
+    """
+    Trailing-window sums for every window at once: result[k, i] is the sum of the
+    windows[k] values ending at row i (NaN while the window is incomplete).
+    cumulative is the running sum with a leading zero (length n + 1).
+    """
+    n = len(cumulative) - 1
+    ends = np.arange(1, n + 1)
+    starts = ends[None, :] - np.asarray(windows)[:, None]
+    sums = cumulative[ends][None, :] - cumulative[np.maximum(starts, 0)]
+    return np.where(starts >= 0, sums, np.nan)
+
+
+class RollingStats:
+    """
+    Rolling mean, sample std, covariance and correlation of two aligned series for a set
+    of windows, computed in one pass from cumulative sums and cross-products.
+    Matches pandas rolling(window) with the default min_periods: a window containing a
+    NaN gives NaN.
+    """
+
+    def __init__(self, windows, stats):
+        self.windows = list(windows)
+        self.stats = stats  # column -> (len(windows), n) array
+        self._row = {w: k for k, w in enumerate(self.windows)}
+
+    @classmethod
+    def compute(cls, a, b, windows=ROLLING_WINDOWS):
+        a = np.asarray(a, dtype=float)
+        b = np.asarray(b, dtype=float)
+        windows = list(windows)
+
+        def cumulative(values):
+            return np.concatenate([[0.0], np.cumsum(values)])
+
+        # Centre on the global means so the cumulative squares don't lose precision
+        valid_a, valid_b = ~np.isnan(a), ~np.isnan(b)
+        offset_a = a[valid_a].mean() if valid_a.any() else 0.0
+        offset_b = b[valid_b].mean() if valid_b.any() else 0.0
+        ca = np.where(valid_a, a - offset_a, 0.0)
+        cb = np.where(valid_b, b - offset_b, 0.0)
+
+        full_a = window_sums(cumulative(~valid_a), windows) == 0
+        full_b = window_sums(cumulative(~valid_b), windows) == 0
+        w = np.asarray(windows, dtype=float)[:, None]
+
+        sum_a, sum_b = window_sums(cumulative(ca), windows), window_sums(cumulative(cb), windows)
+        squares_a, squares_b = cumulative(ca * ca), cumulative(cb * cb)
+        var_a = (window_sums(squares_a, windows) - sum_a ** 2 / w) / (w - 1)
+        var_b = (window_sums(squares_b, windows) - sum_b ** 2 / w) / (w - 1)
+        cov = (window_sums(cumulative(ca * cb), windows) - sum_a * sum_b / w) / (w - 1)
+
+        # Differences of large running sums leave rounding noise; below this a window is flat
+        eps = 64 * np.finfo(float).eps
+        var_a = np.where(var_a > eps * squares_a[-1] / (w - 1), var_a, 0.0)
+        var_b = np.where(var_b > eps * squares_b[-1] / (w - 1), var_b, 0.0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            denom = np.sqrt(var_a * var_b)
+            corr = np.where(denom > 0, np.clip(cov / denom, -1.0, 1.0), np.nan)
+
+        both = full_a & full_b
+        stats = {
+            "RollingMean_A": np.where(full_a, sum_a / w + offset_a, np.nan),
+            "RollingMean_B": np.where(full_b, sum_b / w + offset_b, np.nan),
+            "RollingStd_A": np.where(full_a, np.sqrt(var_a), np.nan),
+            "RollingStd_B": np.where(full_b, np.sqrt(var_b), np.nan),
+            "Rolling_Covariance": np.where(both, cov, np.nan),
+            "Rolling_Correlation": np.where(both, corr, np.nan),
+        }
+        return cls(windows, stats)
+
+    def frame(self, window, index=None):
+        """All statistics for one window as a DataFrame (on `index` if given)."""
+        k = self._row[window]
+        return pd.DataFrame({column: values[k] for column, values in self.stats.items()}, index=index)
+
+
+_stats_cache = FingerprintCache(max_entries=8)
+
+
+def get_rolling_stats(df, column_a, column_b, window):
+    """
+    Rolling statistics of two columns of df for `window`. Every window in ROLLING_WINDOWS is
+    computed together and memoized on a fingerprint of the two columns, so changing the
+    window is a lookup. df is not modified.
+    """
+    if window not in ROLLING_WINDOWS:
+        return RollingStats.compute(df[column_a], df[column_b], [window]).frame(window, df.index)
+
+    stats = _stats_cache.get_or_build(
+        frame_fingerprint(df, [column_a, column_b]),
+        lambda: RollingStats.compute(df[column_a], df[column_b], ROLLING_WINDOWS),
+    )
+    return stats.frame(window, df.index)
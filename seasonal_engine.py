@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+from fingerprint_cache import FingerprintCache, frame_fingerprint
+from trading_calendar import get_trading_calendar
+
+
+def backfill_axis0(cube):
+    """Backward fill NaNs along the first axis (like DataFrame.bfill on each column)."""
+    n = cube.shape[0]
+    valid = ~np.isnan(cube)
+    positions = np.where(valid, np.arange(n).reshape((n,) + (1,) * (cube.ndim - 1)), n)
+    next_valid = np.minimum.accumulate(positions[::-1], axis=0)[::-1]
+    padded = np.concatenate([cube, np.full((1,) + cube.shape[1:], np.nan)], axis=0)
+    return np.take_along_axis(padded, next_valid, axis=0)
+
+
+def rotation_offsets(start_position, n_positions):
+    """1-based x position of each 1-based position when the season starts at start_position."""
+    return (np.arange(1, n_positions + 1) - start_position) % n_positions + 1
+
+
+class SeasonalCube:
+    """
+    Position (e.g. trading day of year) x year x series array of mean values, backward filled
+    along the position axis. Views for a series, a year subset, excluded positions and a
+    starting position are slices of the same array.
+    """
+
+    def __init__(self, values, years, series, has_data=None):
+        self.values = values
+        self.years = np.asarray(years)
+        self.series = list(series)
+        # (year, series) pairs with at least one observation
+        self.has_data = has_data if has_data is not None else ~np.isnan(values).all(axis=0)
+
+    @property
+    def n_positions(self):
+        return self.values.shape[0]
+
+    @classmethod
+    def build(cls, positions, years, frame, series, n_positions):
+        """
+        positions: 1-based int array (e.g. trading day of year); years: int array; frame: DataFrame
+        holding the series columns row-aligned with them. One scatter-add pass for all series.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        unique_years, year_index = np.unique(np.asarray(years), return_inverse=True)
+        data = frame[list(series)].to_numpy(dtype=float)
+
+        shape = (n_positions, len(unique_years), len(series))
+        sums = np.zeros(shape)
+        counts = np.zeros(shape)
+        valid = ~np.isnan(data)
+        cells = np.ravel_multi_index(
+            (np.repeat(positions - 1, len(series)), np.repeat(year_index, len(series)), np.tile(np.arange(len(series)), len(positions))),
+            shape,
+        )
+        flat_valid = valid.ravel()
+        np.add.at(sums.reshape(-1), cells[flat_valid], data.ravel()[flat_valid])
+        np.add.at(counts.reshape(-1), cells[flat_valid], 1)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / counts, np.nan)
+        values = backfill_axis0(means)
+
+        # Years without any observation of a series stay all-NaN (dropped in views)
+        has_data = counts.sum(axis=0) > 0
+        values[:, ~has_data] = np.nan
+        return cls(values, unique_years, series, has_data)
+
+    def view(self, series, years=None, excluded_positions=(), start_position=1):
+        """
+        DataFrame indexed by shifted x (1..n, starting at start_position) with one column per year.
+        Excluded positions are removed before shifting, as the old per-series pivot did.
+        """
+        s = self.series.index(series)
+        year_mask = self.has_data[:, s].copy()
+        if years is not None:
+            year_mask &= np.isin(self.years, list(years))
+        if not year_mask.any():
+            return None
+
+        n = self.n_positions
+        keep = np.ones(n, dtype=bool)
+        excluded = np.asarray(list(excluded_positions), dtype=np.int64)
+        keep[excluded[(excluded >= 1) & (excluded <= n)] - 1] = False
+
+        shifted = rotation_offsets(start_position, n)[keep]
+        order = np.argsort(shifted, kind="stable")
+        block = self.values[keep][:, year_mask, s][order]
+        return pd.DataFrame(block, index=pd.Index(shifted[order], name="shifted_x"), columns=self.years[year_mask])
+
+
+def month_excluded_positions(months, month_ranges):
+    """Positions covered by the given month abbreviations, from {"Jan": (first, last), ...}."""
+    if not months:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate([np.arange(month_ranges[m][0], month_ranges[m][1] + 1) for m in months])
+
+
+_cube_cache = FingerprintCache(max_entries=8)
+
+
+def get_trading_day_cube(df, series, date_column="Date", calendar=None):
+    """
+    Trading-day-of-year seasonal cube for the series columns of df, memoized on a fingerprint
+    of the date and series columns, so widget changes re-slice instead of rebuilding.
+    """
+    calendar = calendar or get_trading_calendar()
+    series = [s for s in series if s in df.columns]
+
+    def build():
+        dates = pd.to_datetime(df[date_column], errors="coerce")
+        rows = dates.notna().to_numpy()
+        dates = dates[rows]
+        positions = calendar.day_of_year(dates)
+        # Weekend-dated bars before a year's first session land on 0; fold them into day 1
+        positions = np.maximum(positions, 1)
+        n_positions = max(calendar.max_sessions_per_year(), int(positions.max()) if len(positions) else 1)
+        return SeasonalCube.build(positions, dates.dt.year.to_numpy(), df.loc[rows], series, n_positions)
+
+    return _cube_cache.get_or_build((calendar.name, frame_fingerprint(df, [date_column] + series)), build)
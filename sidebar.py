@@ -2,47 +2,30 @@ import streamlit as st
 from datetime import datetime, date
 import pandas as pd
 from datetime import datetime
+from preset_catalog import get_preset_catalog
 
 current_year = int(datetime.now().year)
+MAX_SYMBOL_OPTIONS = 50
 
 def load_presets_from_csv():
-    df = pd.read_csv("PriceAnalyzerIn.csv")
-    presets = []
-    for _, row in df.iterrows():
-        presets.append({
-            'name': row['Name'],
-            'tickers': eval(row['tickerList']),
-            'months': eval(row['contractMonthsList']),
-            'weights': eval(row['weightsList']),
-            'conversions': eval(row['convList']),
-            'description': row['desc'],
-            'group': row['group'],
-            'region': row['region'],
-            'months_code': ''.join(eval(row['contractMonthsList']))
-        })
-    return presets
-
-def show_sidebar(commodity_categories):
+    """All presets as a list of dicts (parsed once per CSV modification)."""
+    return get_preset_catalog().presets
+
+def show_sidebar(universe):
     with st.sidebar:
         input_mode = st.radio("Choose Input Mode", ["Preset", "Manual"])
-        presets = load_presets_from_csv()
+        catalog = get_preset_catalog()
+        presets = catalog.presets
         selected_preset = None
 
         if input_mode == "Preset":
             st.markdown("### 📚 Presets")
 
-            groups = sorted(set(p['group'] for p in presets))
-            selected_group = st.selectbox("Select Group", groups)
-
-            filtered_by_group = [p for p in presets if p['group'] == selected_group]
-
-            regions = sorted(set(p['region'] for p in filtered_by_group))
-            selected_region = st.selectbox("Select Region", regions)
-
-            filtered_by_region = [p for p in filtered_by_group if p['region'] == selected_region]
+            selected_group = st.selectbox("Select Group", catalog.groups())
+            selected_region = st.selectbox("Select Region", catalog.regions(selected_group))
 
             # Extract and format month codes
-            month_codes = sorted(set(p['months_code'] for p in filtered_by_region))
+            month_codes = catalog.month_codes(selected_group, selected_region)
             month_codes_clean = [str(code) for code in month_codes if code]
             month_display = {code: f"Contract: {code}" for code in month_codes_clean}
 
@@ -52,15 +35,12 @@ def show_sidebar(commodity_categories):
                 format_func=lambda x: month_display.get(x, x)
             )
 
-            # Filter presets based on selected month
-            filtered_by_month = [p for p in filtered_by_region if p['months_code'] == selected_month_code]
-
             # Spread selection
-            descriptions = [p['description'] for p in filtered_by_month]
+            descriptions = catalog.descriptions(selected_group, selected_region, selected_month_code)
             selected_desc = st.selectbox("Select Spread", descriptions)
 
             # 💥 FIXED: Select full preset, not just description
-            selected_preset = next((p for p in filtered_by_month if p['description'] == selected_desc), None)
+            selected_preset = catalog.find(selected_group, selected_region, selected_month_code, selected_desc)
 
             st.markdown("### 📅 Date Range")
             col1, col2 = st.columns(2)
@@ -89,42 +69,53 @@ def show_sidebar(commodity_categories):
                 with st.expander(f"⚙️ Configure {group_name}", expanded=False):
                     category = st.selectbox(
                         f"{group_name}: Exchange / Group",
-                        sorted(commodity_categories.keys()),
+                        universe.categories(),
                         key=f"{group_name}_category"
                     )
-                    filtered_items = sorted(commodity_categories[category], key=lambda x: x[1])
-                    symbol_options = [f"{desc} ({symbol})" for symbol, desc in filtered_items]
-                    selected_labels = st.multiselect(
+                    query = st.text_input(
+                        f"{group_name}: Search",
+                        key=f"{group_name}_search",
+                        placeholder="Symbol or name, e.g. crude dec"
+                    )
+                    # Only the capped matches (plus what is already selected) are sent to the browser
+                    matches, total_matches = universe.search(query, category, limit=MAX_SYMBOL_OPTIONS)
+                    # A new search changes the options and so the widget's identity; re-assigning
+                    # the keyed value keeps Streamlit from dropping the selection with the old widget
+                    symbols_key = f"{group_name}_symbols"
+                    st.session_state[symbols_key] = st.session_state.get(symbols_key, [])
+                    if total_matches > len(matches):
+                        st.caption(f"Showing {len(matches)} of {total_matches} matches. Refine the search and press Enter to narrow the list.")
+                    selected_symbols = st.multiselect(
                         f"{group_name}: Select Instruments",
-                        symbol_options,
-                        key=f"{group_name}_symbols"
+                        list(dict.fromkeys(st.session_state[symbols_key] + matches)),
+                        key=symbols_key,
+                        format_func=lambda symbol: f"{universe.describe(symbol)} ({symbol})"
                     )
                     group = []
-                    if selected_labels:
+                    if selected_symbols:
                         st.markdown("##### ⚖️ Weights & ⚙️ Conversions")
-                    for label in selected_labels:
-                        for symbol, desc in filtered_items:
-                            if f"{desc} ({symbol})" == label:
-                                full_label = f"[{category}] {desc} ({symbol})"
-                                cols = st.columns([2, 1, 1])
-                                with cols[0]:
-                                    st.markdown(f"**{desc} ({symbol})**")
-                                with cols[1]:
-                                    weight = st.number_input(
-                                        "Weight", min_value=-10.0, value=default_weight, step=0.1,
-                                        key=f"{group_name}_{symbol}_weight"
-                                    )
-                                with cols[2]:
-                                    conversion = st.number_input(
-                                        "Conversion", min_value=-10.0, value=1.0, step=0.1,
-                                        key=f"{group_name}_{symbol}_conversion"
-                                    )
-                                group.append({
-                                    "label": full_label,
-                                    "symbol": symbol,
-                                    "weight": weight,
-                                    "conversion": conversion
-                                })
+                    for symbol in selected_symbols:
+                        desc = universe.describe(symbol)
+                        full_label = f"[{universe.category_of(symbol) or category}] {desc} ({symbol})"
+                        cols = st.columns([2, 1, 1])
+                        with cols[0]:
+                            st.markdown(f"**{desc} ({symbol})**")
+                        with cols[1]:
+                            weight = st.number_input(
+                                "Weight", min_value=-10.0, value=default_weight, step=0.1,
+                                key=f"{group_name}_{symbol}_weight"
+                            )
+                        with cols[2]:
+                            conversion = st.number_input(
+                                "Conversion", min_value=-10.0, value=1.0, step=0.1,
+                                key=f"{group_name}_{symbol}_conversion"
+                            )
+                        group.append({
+                            "label": full_label,
+                            "symbol": symbol,
+                            "weight": weight,
+                            "conversion": conversion
+                        })
                     return group
 
             group_A = select_multiple_commodities("Group A", default_weight=1.0)
@@ -215,3 +206,28 @@ COLORS = {
         2030: "#dbdb8d",
     }
 }
+
+_matplotlib_theme_applied = False
+
+def apply_matplotlib_theme():
+    """Dark seaborn/matplotlib theme for the matplotlib tabs; imported and applied on first use."""
+    global _matplotlib_theme_applied
+    if _matplotlib_theme_applied:
+        return
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set_theme(style="darkgrid")
+    plt.rcParams.update({
+        'axes.facecolor': COLORS["background"],
+        'figure.facecolor': COLORS["background"],
+        'text.color': COLORS["text"],
+        'axes.labelcolor': COLORS["text"],
+        'xtick.color': COLORS["text"],
+        'ytick.color': COLORS["text"],
+        'grid.color': COLORS["grid"],
+        'axes.grid': True,
+        'grid.linestyle': '--',
+        'grid.alpha': 0.7
+    })
+    _matplotlib_theme_applied = True
@@ -0,0 +1,105 @@
+"""
+Startup timing for the app.
+
+Import-time breakdown of what streamlit_app.py loads before the first widget paints:
+    python startup_profile.py
+    python startup_profile.py --budget-ms 2000 --top 15
+    python startup_profile.py tabs.tab3          # profile a specific module
+
+Exits with status 1 when the total import time is over the budget. Inside the app,
+set SPARTAN_SHOW_TIMINGS=1 to show a per-phase timing table in the sidebar.
+"""
+import argparse
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+# Modules streamlit_app.py imports at startup (tabs and their libraries load on demand)
+STARTUP_MODULES = [
+    "streamlit",
+    "pandas",
+    "create_marketview_options",
+    "gcc_sparta_lib",
+    "data_engineering",
+    "sidebar",
+    "symbol_universe",
+    "lazy_tabs",
+]
+DEFAULT_BUDGET_MS = 2500
+
+
+class StartupTimer:
+    """Records elapsed time between named phases of a script run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.phases = []
+
+    def mark(self, label):
+        now = time.perf_counter()
+        self.phases.append((label, (now - self.last) * 1000))
+        self.last = now
+
+    def report(self):
+        """[(phase, ms)] plus the total."""
+        return self.phases + [("total", (self.last - self.started) * 1000)]
+
+
+def profile_imports(modules):
+    """
+    Import modules in a fresh interpreter with -X importtime.
+    Returns (list of (module, self_us, cumulative_us) for every import, wall-clock ms).
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - t0) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return rows, wall_ms
+
+
+def summarize(rows):
+    """Total import time per top-level package, in ms."""
+    per_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        per_package[name.strip().split(".")[0]] += self_us
+    return sorted(((pkg, us / 1000) for pkg, us in per_package.items()), key=lambda item: -item[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time breakdown of the app's startup.")
+    parser.add_argument("modules", nargs="*", default=STARTUP_MODULES)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    rows, wall_ms = profile_imports(args.modules)
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+
+    print(f"Top-level modules ({', '.join(args.modules)}):")
+    for name, _, cumulative_us in rows:
+        if name.strip() in args.modules:
+            print(f"  {name.strip():<30} {cumulative_us / 1000:8.1f} ms")
+
+    print(f"\nSlowest packages (self time):")
+    for package, ms in summarize(rows)[:args.top]:
+        print(f"  {package:<30} {ms:8.1f} ms")
+
+    status = "OK" if total_ms <= args.budget_ms else "OVER BUDGET"
+    print(f"\nTotal import time {total_ms:.0f} ms (process wall clock {wall_ms:.0f} ms), "
+          f"budget {args.budget_ms:.0f} ms: {status}")
+    sys.exit(0 if total_ms <= args.budget_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,23 @@
+from startup_profile import StartupTimer
+startup_timer = StartupTimer()
+
+import os
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
-import matplotlib.dates as mdates
-from scipy import stats
-from create_marketview_options import get_available_commodities, categorize_commodities, parse_contract_symbol, check_expiry, append_new_after_old, get_next_commodity_symbol, get_expiry_date
-from gcc_sparta_lib import get_mv_data
-from tabs.tab1 import render_tab1
-from tabs.tab2 import render_tab2
-from tabs.tab3 import render_tab3
-from tabs.tab4 import render_tab4
-from tabs.tab5 import render_tab5
-from tabs.tab6 import render_tab6
+from create_marketview_options import preset_contract_symbol
+from symbol_universe import get_symbol_universe
 from sidebar import show_sidebar, COLORS
-from data_engineering import process_commodities_data,load_commodity_data
+from lazy_tabs import render_tabs, deferred
+from data_engineering import process_commodities_data
+
+# Tab modules (and the plotting/analytics libraries they use) are imported when the tab first renders
+render_tab1 = deferred("tabs.tab1", "render_tab1")
+render_tab2 = deferred("tabs.tab2", "render_tab2")
+render_tab3 = deferred("tabs.tab3", "render_tab3")
+render_tab4 = deferred("tabs.tab4", "render_tab4")
+render_tab5 = deferred("tabs.tab5", "render_tab5")
+render_tab6 = deferred("tabs.tab6", "render_tab6")
+startup_timer.mark("imports")
 
 current_date = datetime.now()
 current_month = current_date.month
@@ -44,20 +46,14 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Apply custom theme
-sns.set_theme(style="darkgrid")
-plt.rcParams.update({
-    'axes.facecolor': COLORS["background"],
-    'figure.facecolor': COLORS["background"],
-    'text.color': COLORS["text"],
-    'axes.labelcolor': COLORS["text"],
-    'xtick.color': COLORS["text"],
-    'ytick.color': COLORS["text"],
-    'grid.color': COLORS["grid"],
-    'axes.grid': True,
-    'grid.linestyle': '--',
-    'grid.alpha': 0.7
-})
+# Optionally warm the price store for every preset in the background (once per server process)
+@st.cache_resource
+def start_preset_prefetch():
+    from prefetch_presets import start_background_prefetch
+    return start_background_prefetch()
+
+if os.getenv("SPARTAN_PREFETCH_ON_START") == "1":
+    start_preset_prefetch()
 
 # Styling for Streamlit
 st.markdown("""
@@ -116,12 +112,13 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Get the commodities
-AVAILABLE_COMMODITIES = get_available_commodities()
-commodity_categories = categorize_commodities(AVAILABLE_COMMODITIES)
+universe = get_symbol_universe()
+AVAILABLE_COMMODITIES = universe.commodities
 
 # Sidebar UI
 # In main.py, after getting sidebar inputs:
-group_A, group_B, start_date, end_date, rolling_window, var_confidence, chart_height, selected_preset,presets = show_sidebar(commodity_categories)
+group_A, group_B, start_date, end_date, rolling_window, var_confidence, chart_height, selected_preset,presets = show_sidebar(universe)
+startup_timer.mark("sidebar")
 
 # Add logic to handle presets
 if selected_preset:
@@ -139,18 +136,10 @@ if selected_preset:
             preset['weights'], 
             preset['conversions'])):
 
-        # Convert futures month code to integer
-        month_int = futures_month_map.get(month_future.upper())
-        if not month_int:
-            raise ValueError(f"Invalid futures month code: {month_future}")
-
-        # Determine year suffix
-        symbol_year = (current_year + 1 if month_int <= current_month else current_year) % 100
-
         target_group = group_A if i == 0 else group_B
         target_group.append({
             "label": f"[PRESET] {ticker} {month_future}",
-            "symbol": f"{ticker}{month_future}{symbol_year}",  # zero-padded year
+            "symbol": preset_contract_symbol(ticker, month_future, current_date),
             "weight": weight,
             "conversion": conversion
         })
@@ -161,56 +150,51 @@ merged_data, group_A_name, group_B_name,meta_A,meta_B = process_commodities_data
     {g["symbol"]: g["conversion"] for g in group_A}, 
     {g["symbol"]: g["conversion"] for g in group_B},  # Passing conversion values
 )
+startup_timer.mark("load & merge data")
+
+if merged_data.empty:
+    st.warning("No data available for the selected commodities.")
+    st.stop()
+
 # Benchmark is Group A's first instrument
 meta_A_month_letter = meta_A[0][2][0]
 meta_A_month_int = futures_month_map.get(meta_A_month_letter.upper())
 list_of_input_instruments = [item[0] for item in (meta_A + meta_B)]
 
 # Handle the merged data
-if not merged_data.empty:
-    st.info("Data is available for analysis.")
-    with st.expander("Click to view merged data", expanded=False):
-        st.dataframe(merged_data)
-else:
-    st.warning("No data available for the selected commodities.")
+st.info("Data is available for analysis.")
+with st.expander("Click to view merged data", expanded=False):
+    st.dataframe(merged_data)
 
 # Create tabs for different analyses
-tab1, tab2, tab3, tab4, tab5,tab6 = st.tabs([
-    "📊 Market Overview", 
-    "🔄 Correlation Analysis", 
-    "📈 Seasonal Patterns",
-    "⚠️ Risk Metrics",
-    "🌦️ Raul-Seasonality-Flat",
-    "🌦️ Raul-Seasonality-Spreads"
-])
-
-
-with tab1:
-    render_tab1(
+lazy_tabs = st.sidebar.toggle(
+    "Load tabs on demand", value=True,
+    help="Only load and compute the tab you open. Turn off to render every tab on each rerun."
+)
+
+render_tabs({
+    "📊 Market Overview": lambda: render_tab1(
         merged_data=merged_data,
         group_A_name=group_A_name,
         group_B_name=group_B_name,
         chart_height=chart_height,
         COLORS=COLORS
-    )
-
-with tab2:
-    render_tab2(tab2, merged_data, rolling_window, chart_height, COLORS, group_A_name, group_B_name)
-
-with tab3:
-    render_tab3(merged_data, [group_A_name, group_B_name],meta_A_month_int,list_of_input_instruments)
-
-with tab4:
-    render_tab4(
+    ),
+    "🔄 Correlation Analysis": lambda: render_tab2(st.container(), merged_data, rolling_window, chart_height, COLORS, group_A_name, group_B_name),
+    "📈 Seasonal Patterns": lambda: render_tab3(merged_data, [group_A_name, group_B_name],meta_A_month_int,list_of_input_instruments),
+    "⚠️ Risk Metrics": lambda: render_tab4(
         merged_data=merged_data,
         group_A_name=group_A_name,
         group_B_name=group_B_name,
         var_confidence=var_confidence,
-        COLORS=COLORS
-    )
-
-with tab5:
-    render_tab5(merged_data, [group_A_name, group_B_name],meta_A_month_int,list_of_input_instruments)
-
-with tab6:
-    render_tab6(list_of_input_instruments)
\ No newline at end of file
+        COLORS=COLORS,
+        constituents=[label for _, label, _ in meta_A + meta_B]
+    ),
+    "🌦️ Raul-Seasonality-Flat": lambda: render_tab5(merged_data, [group_A_name, group_B_name],meta_A_month_int,list_of_input_instruments),
+    "🌦️ Raul-Seasonality-Spreads": lambda: render_tab6(list_of_input_instruments),
+}, lazy=lazy_tabs)
+startup_timer.mark("render tab")
+
+if os.getenv("SPARTAN_SHOW_TIMINGS") == "1":
+    with st.sidebar.expander("⏱️ Startup timing", expanded=False):
+        st.table({phase: f"{ms:.0f} ms" for phase, ms in startup_timer.report()})
@@ -0,0 +1,139 @@
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+from create_marketview_options import CATEGORY_PREFIXES, get_available_commodities
+
+MAX_SEARCH_RESULTS = 50
+
+
+def assign_categories(sorted_symbols, rules=CATEGORY_PREFIXES):
+    """
+    Category index (into rules) for each symbol of a sorted str array, -1 if none matches.
+    Every prefix covers a contiguous slice of the sorted array, found with two binary
+    searches; rules are applied last-to-first so the first matching rule wins.
+    """
+    codes = np.full(len(sorted_symbols), -1, dtype=np.int16)
+    for code in range(len(rules) - 1, -1, -1):
+        for prefix in rules[code][1]:
+            lo = np.searchsorted(sorted_symbols, prefix, side="left")
+            hi = np.searchsorted(sorted_symbols, prefix + "\U0010ffff", side="left")
+            codes[lo:hi] = code
+    return codes
+
+
+class SymbolUniverse:
+    """
+    Compact, searchable index over the commodity catalog.
+
+    Entries are held in description order in parallel arrays, with a sorted symbol array
+    for prefix lookups, per-category index partitions, and one lowercase text blob
+    ("symbol description" per line) for substring search.
+    """
+
+    def __init__(self, commodities, rules=CATEGORY_PREFIXES):
+        self.commodities = commodities
+        self.category_names = [name for name, _ in rules]
+
+        symbols = np.array(list(commodities), dtype=str)
+        descriptions = np.array([commodities[s] for s in symbols.tolist()], dtype=object)
+        order = np.lexsort((symbols, descriptions.astype(str))) if len(symbols) else np.arange(0)
+        self.symbols = symbols[order].astype(object)
+        self.descriptions = descriptions[order]
+
+        # Sorted symbols (exact and case-folded) -> position in description order
+        by_symbol = np.argsort(symbols[order], kind="stable")
+        self._sorted_symbols = symbols[order][by_symbol]
+        self._sorted_pos = by_symbol
+        upper = np.char.upper(symbols[order])
+        self._upper_pos = np.argsort(upper, kind="stable")
+        self._sorted_upper = upper[self._upper_pos]
+
+        codes = np.empty(len(symbols), dtype=np.int16)
+        codes[by_symbol] = assign_categories(self._sorted_symbols, rules)
+        self.category_codes = codes
+        self._partitions = {code: np.flatnonzero(codes == code) for code in range(len(rules))}
+
+        self._search_text = np.array(
+            [f"{s} {d}".lower() for s, d in zip(self.symbols.tolist(), self.descriptions.tolist())], dtype=str
+        )
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return self._position(symbol) is not None
+
+    def _position(self, symbol):
+        i = np.searchsorted(self._sorted_symbols, symbol)
+        if i < len(self._sorted_symbols) and self._sorted_symbols[i] == symbol:
+            return self._sorted_pos[i]
+        return None
+
+    def describe(self, symbol):
+        return self.commodities.get(symbol, symbol)
+
+    def category_of(self, symbol):
+        pos = self._position(symbol)
+        if pos is None or self.category_codes[pos] < 0:
+            return None
+        return self.category_names[self.category_codes[pos]]
+
+    def categories(self):
+        """Non-empty category names, sorted."""
+        return sorted(self.category_names[code] for code, idx in self._partitions.items() if len(idx))
+
+    def category_items(self):
+        """{category: [(symbol, desc), ...]} in description order, like the old categorize_commodities."""
+        categories = defaultdict(list)
+        for code, idx in self._partitions.items():
+            if len(idx):
+                categories[self.category_names[code]] = list(zip(self.symbols[idx].tolist(), self.descriptions[idx].tolist()))
+        return categories
+
+    def _prefix_matches(self, prefix):
+        """Positions of symbols starting with prefix (case-insensitive)."""
+        prefix = prefix.upper()
+        lo = np.searchsorted(self._sorted_upper, prefix, side="left")
+        hi = np.searchsorted(self._sorted_upper, prefix + "\U0010ffff", side="left")
+        return np.sort(self._upper_pos[lo:hi])
+
+    def search(self, query="", category=None, limit=MAX_SEARCH_RESULTS):
+        """
+        Symbols matching query, capped at limit. Returns (symbols, total_matches).
+
+        Every whitespace-separated token must appear in the symbol or description.
+        Symbols starting with the first token come first, the rest follow in description order.
+        """
+        tokens = query.lower().split()
+        if category is not None:
+            mask = self.category_codes == self.category_names.index(category)
+        else:
+            mask = np.ones(len(self), dtype=bool)
+        for token in tokens:
+            mask &= np.char.find(self._search_text, token) >= 0
+        candidates = np.flatnonzero(mask)
+
+        if tokens:
+            prefixed = np.isin(candidates, self._prefix_matches(tokens[0]))
+            candidates = np.concatenate([candidates[prefixed], candidates[~prefixed]])
+
+        return self.symbols[candidates[:limit]].tolist(), len(candidates)
+
+
+_universes = {}
+_universes_lock = threading.Lock()
+
+
+def get_symbol_universe():
+    """SymbolUniverse over get_available_commodities(), built once per calendar year."""
+    year = datetime.now().year
+    with _universes_lock:
+        universe = _universes.get(year)
+        if universe is None:
+            universe = SymbolUniverse(get_available_commodities())
+            _universes.clear()
+            _universes[year] = universe
+        return universe
@@ -5,8 +5,15 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import seaborn as sns
+from sidebar import apply_matplotlib_theme
+from kde import plot_kde
+from downsample import downsample
+from figure_cache import cached_pyplot, figure_key
+from data_engineering import RETURN_COLUMNS, with_derived_columns
 
 def render_tab1(merged_data, group_A_name, group_B_name, chart_height, COLORS):
+    apply_matplotlib_theme()
+    merged_data = with_derived_columns(merged_data, RETURN_COLUMNS)
     st.markdown('<div class="section-header">🛢️ Price Overview</div>', unsafe_allow_html=True)
 
     col1, col2 = st.columns(2)
@@ -49,37 +56,40 @@ def render_tab1(merged_data, group_A_name, group_B_name, chart_height, COLORS):
 
     with col2:
         st.markdown("### Historical Price Comparison")
-        fig, ax = plt.subplots(figsize=(10, chart_height/100))
-
-        # Plot group totals
-        ax.plot(merged_data['Date'], merged_data[group_A_name], 
-                color=COLORS.get("commodity1", "#1f77b4"), linewidth=2, label=group_A_name)
-        ax.plot(merged_data['Date'], merged_data[group_B_name], 
-                color=COLORS.get("commodity2", "#ff7f0e"), linewidth=2, label=group_B_name)
-
-        ax.set_xlabel('Date', fontsize=12)
-        ax.set_ylabel('Price ($)', fontsize=12)
-        ax.set_title(f'{group_A_name} vs {group_B_name} Prices', fontsize=14, pad=20)
-        ax.legend(loc='upper left', frameon=True)
-
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-        ax.xaxis.set_major_locator(mdates.MonthLocator(interval=3))
-        plt.xticks(rotation=45)
-        ax.grid(True, linestyle='--', alpha=0.7)
-
-        # Add spread on secondary axis
-        ax2 = ax.twinx()
-        ax2.plot(merged_data['Date'], merged_data['Spread'], 
-                color=COLORS.get("spread", "#2ca02c"), linewidth=1.5, linestyle='--', label='Spread')
-        ax2.set_ylabel('Spread ($)', fontsize=12)
-        ax2.tick_params(axis='y')
-
-        lines1, labels1 = ax.get_legend_handles_labels()
-        lines2, labels2 = ax2.get_legend_handles_labels()
-        ax.legend(lines1 + lines2, labels1 + labels2, loc='upper left', frameon=True)
-
-        fig.tight_layout()
-        st.pyplot(fig)
+        def draw_prices():
+            fig, ax = plt.subplots(figsize=(10, chart_height/100))
+
+            # Plot group totals
+            ax.plot(*downsample(merged_data['Date'], merged_data[group_A_name]),
+                    color=COLORS.get("commodity1", "#1f77b4"), linewidth=2, label=group_A_name)
+            ax.plot(*downsample(merged_data['Date'], merged_data[group_B_name]),
+                    color=COLORS.get("commodity2", "#ff7f0e"), linewidth=2, label=group_B_name)
+
+            ax.set_xlabel('Date', fontsize=12)
+            ax.set_ylabel('Price ($)', fontsize=12)
+            ax.set_title(f'{group_A_name} vs {group_B_name} Prices', fontsize=14, pad=20)
+            ax.legend(loc='upper left', frameon=True)
+
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
+            ax.xaxis.set_major_locator(mdates.MonthLocator(interval=3))
+            plt.xticks(rotation=45)
+            ax.grid(True, linestyle='--', alpha=0.7)
+
+            # Add spread on secondary axis
+            ax2 = ax.twinx()
+            ax2.plot(*downsample(merged_data['Date'], merged_data['Spread']),
+                    color=COLORS.get("spread", "#2ca02c"), linewidth=1.5, linestyle='--', label='Spread')
+            ax2.set_ylabel('Spread ($)', fontsize=12)
+            ax2.tick_params(axis='y')
+
+            lines1, labels1 = ax.get_legend_handles_labels()
+            lines2, labels2 = ax2.get_legend_handles_labels()
+            ax.legend(lines1 + lines2, labels1 + labels2, loc='upper left', frameon=True)
+
+            fig.tight_layout()
+            return fig
+
+        cached_pyplot(figure_key("tab1_prices", merged_data[['Date', group_A_name, group_B_name, 'Spread']], chart_height, COLORS), draw_prices)
 
     # Group constituents section - NEW SECTION
     st.markdown('<div class="section-header">🧩 Group Constituents</div>', unsafe_allow_html=True)
@@ -113,53 +123,66 @@ def render_tab1(merged_data, group_A_name, group_B_name, chart_height, COLORS):
         
         with tabs[1]:
             # Create line chart showing all assets
-            fig, ax = plt.subplots(figsize=(10, chart_height/100))
+            def draw_assets():
+                fig, ax = plt.subplots(figsize=(10, chart_height/100))
             
-            # Plot each asset with a different color
-            for i, asset in enumerate(a_assets):
-                color = plt.cm.tab10(i % 10)  # Cycle through 10 colors
-                ax.plot(merged_data['Date'], merged_data[asset], linewidth=1.5, label=asset, alpha=0.8, color=color)
+                # Plot each asset with a different color
+                for i, asset in enumerate(a_assets):
+                    color = plt.cm.tab10(i % 10)  # Cycle through 10 colors
+                    ax.plot(*downsample(merged_data['Date'], merged_data[asset]), linewidth=1.5, label=asset, alpha=0.8, color=color)
             
-            ax.set_xlabel('Date', fontsize=12)
-            ax.set_ylabel('Price ($)', fontsize=12)
-            ax.set_title('Individual Asset Performance', fontsize=14, pad=20)
-            ax.legend(loc='upper left', frameon=True, ncol=min(3, len(a_assets)))
+                ax.set_xlabel('Date', fontsize=12)
+                ax.set_ylabel('Price ($)', fontsize=12)
+                ax.set_title('Individual Asset Performance', fontsize=14, pad=20)
+                ax.legend(loc='upper left', frameon=True, ncol=min(3, len(a_assets)))
             
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-            ax.xaxis.set_major_locator(mdates.MonthLocator(interval=3))
-            plt.xticks(rotation=45)
-            ax.grid(True, linestyle='--', alpha=0.7)
+                ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
+                ax.xaxis.set_major_locator(mdates.MonthLocator(interval=3))
+                plt.xticks(rotation=45)
+                ax.grid(True, linestyle='--', alpha=0.7)
             
-            fig.tight_layout()
-            st.pyplot(fig)
+                fig.tight_layout()
+                return fig
+
+            cached_pyplot(figure_key("tab1_assets", merged_data[['Date'] + a_assets], chart_height), draw_assets)
 
     st.markdown('<div class="section-header">📊 Price Distribution Analysis</div>', unsafe_allow_html=True)
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown("### Price Distributions")
-        fig, ax = plt.subplots(figsize=(10, chart_height/100))
-        sns.kdeplot(data=merged_data, x=group_A_name, fill=True, color=COLORS.get("commodity1", "#1f77b4"), alpha=0.6, label=group_A_name)
-        sns.kdeplot(data=merged_data, x=group_B_name, fill=True, color=COLORS.get("commodity2", "#ff7f0e"), alpha=0.6, label=group_B_name)
-        ax.set_xlabel('Price ($)', fontsize=12)
-        ax.set_ylabel('Density', fontsize=12)
-        ax.set_title('Price Distribution Density', fontsize=14, pad=20)
-        ax.legend(loc='upper right', frameon=True)
-        fig.tight_layout()
-        st.pyplot(fig)
+        def draw_price_distributions():
+            fig, ax = plt.subplots(figsize=(10, chart_height/100))
+            plot_kde(ax, merged_data[group_A_name], fill=True, color=COLORS.get("commodity1", "#1f77b4"), alpha=0.6, label=group_A_name)
+            plot_kde(ax, merged_data[group_B_name], fill=True, color=COLORS.get("commodity2", "#ff7f0e"), alpha=0.6, label=group_B_name)
+            ax.set_xlabel('Price ($)', fontsize=12)
+            ax.set_ylabel('Density', fontsize=12)
+            ax.set_title('Price Distribution Density', fontsize=14, pad=20)
+            ax.legend(loc='upper right', frameon=True)
+            fig.tight_layout()
+            return fig
+
+        cached_pyplot(figure_key("tab1_price_kde", merged_data[[group_A_name, group_B_name]], group_A_name, group_B_name, chart_height, COLORS), draw_price_distributions)
+
+    spread_key = figure_key("tab1_spread_distribution", merged_data['Spread'], chart_height, COLORS)
 
     with col2:
         st.markdown("### Spread Distribution")
-        fig, ax = plt.subplots(figsize=(10, chart_height/100))
-        sns.histplot(data=merged_data, x='Spread', bins=30, kde=True, color=COLORS.get("spread", "#2ca02c"), alpha=0.7)
-        plt.axvline(merged_data['Spread'].mean(), color='white', linestyle='dashed', linewidth=2, label=f'Mean: {merged_data["Spread"].mean():.2f}')
-        plt.axvline(merged_data['Spread'].median(), color='red', linestyle='dotted', linewidth=2, label=f'Median: {merged_data["Spread"].median():.2f}')
-        ax.set_xlabel('Spread ($)', fontsize=12)
-        ax.set_ylabel('Frequency', fontsize=12)
-        ax.set_title('Spread Distribution', fontsize=14, pad=20)
-        ax.legend(loc='upper right', frameon=True)
-        fig.tight_layout()
-        st.pyplot(fig)
+        def draw_spread_distribution():
+            fig, ax = plt.subplots(figsize=(10, chart_height/100))
+            spread = merged_data['Spread'].dropna()
+            sns.histplot(x=spread, bins=30, color=COLORS.get("spread", "#2ca02c"), alpha=0.7, ax=ax)
+            plot_kde(ax, spread, color=COLORS.get("spread", "#2ca02c"), scale=len(spread) * (spread.max() - spread.min()) / 30, cut=0)
+            plt.axvline(merged_data['Spread'].mean(), color='white', linestyle='dashed', linewidth=2, label=f'Mean: {merged_data["Spread"].mean():.2f}')
+            plt.axvline(merged_data['Spread'].median(), color='red', linestyle='dotted', linewidth=2, label=f'Median: {merged_data["Spread"].median():.2f}')
+            ax.set_xlabel('Spread ($)', fontsize=12)
+            ax.set_ylabel('Frequency', fontsize=12)
+            ax.set_title('Spread Distribution', fontsize=14, pad=20)
+            ax.legend(loc='upper right', frameon=True)
+            fig.tight_layout()
+            return fig
+
+        cached_pyplot(spread_key, draw_spread_distribution)
 
     # st.markdown('<div class="section-header">📏 Price Ratio Analysis</div>', unsafe_allow_html=True)
     # fig, ax = plt.subplots(figsize=(10, chart_height/100))
@@ -189,5 +212,4 @@ def render_tab1(merged_data, group_A_name, group_B_name, chart_height, COLORS):
     #                 arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=.2', color='white'),
     #                 color='white')
 
-    fig.tight_layout()
-    st.pyplot(fig)
\ No newline at end of file
+    cached_pyplot(spread_key, draw_spread_distribution)
\ No newline at end of file
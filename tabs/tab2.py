@@ -3,8 +3,13 @@
 import streamlit as st
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from sidebar import apply_matplotlib_theme
+from rolling_stats import get_rolling_stats
+from downsample import downsample
+from figure_cache import cached_pyplot, figure_key
 
 def render_tab2(tab2, merged_data, rolling_window, chart_height, COLORS, group_A_name, group_B_name):
+    apply_matplotlib_theme()
     with tab2:
         st.markdown('<div class="section-header">🔄 Correlation Analysis</div>', unsafe_allow_html=True)
 
@@ -13,15 +18,12 @@ def render_tab2(tab2, merged_data, rolling_window, chart_height, COLORS, group_A
             st.warning("Selected commodities are not in the dataset.")
             return
 
-        # Calculate rolling statistics
-        merged_data['RollingMean_A'] = merged_data[group_A_name].rolling(window=rolling_window).mean()
-        merged_data['RollingMean_B'] = merged_data[group_B_name].rolling(window=rolling_window).mean()
-        merged_data['RollingStd_A'] = merged_data[group_A_name].rolling(window=rolling_window).std()
-        merged_data['RollingStd_B'] = merged_data[group_B_name].rolling(window=rolling_window).std()
-        merged_data['Rolling_Correlation'] = merged_data[group_A_name].rolling(window=rolling_window).corr(merged_data[group_B_name])
+        # Rolling statistics for every slider window are computed once per dataset; merged_data is left untouched
+        rolling_stats = get_rolling_stats(merged_data, group_A_name, group_B_name, rolling_window)
+        rolling_stats['Date'] = merged_data['Date']
 
         # Drop NaNs created by rolling calculations
-        rolling_data = merged_data.dropna(subset=[
+        rolling_data = rolling_stats.dropna(subset=[
             'RollingMean_A', 'RollingMean_B', 'Rolling_Correlation'
         ])
 
@@ -30,33 +32,39 @@ def render_tab2(tab2, merged_data, rolling_window, chart_height, COLORS, group_A
         # Rolling correlation plot
         with col1:
             st.markdown(f"### Rolling {rolling_window}-Day Correlation")
-            fig, ax = plt.subplots(figsize=(10, chart_height / 100))
-            ax.plot(rolling_data['Date'], rolling_data['Rolling_Correlation'], color='#ff7f0e', linewidth=2)
-            ax.axhline(y=0, color='white', linestyle='--', alpha=0.5)
-            ax.axhline(y=0.5, color='green', linestyle=':', alpha=0.5)
-            ax.axhline(y=-0.5, color='red', linestyle=':', alpha=0.5)
-            ax.set_xlabel('Date', fontsize=12)
-            ax.set_ylabel('Correlation Coefficient', fontsize=12)
-            ax.set_title('Rolling Correlation Between Assets', fontsize=14, pad=20)
-            ax.set_ylim(-1, 1)
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-            ax.xaxis.set_major_locator(mdates.MonthLocator(interval=3))
-            plt.xticks(rotation=45)
-            fig.tight_layout()
-            st.pyplot(fig)
+            def draw_correlation():
+                fig, ax = plt.subplots(figsize=(10, chart_height / 100))
+                ax.plot(*downsample(rolling_data['Date'], rolling_data['Rolling_Correlation']), color='#ff7f0e', linewidth=2)
+                ax.axhline(y=0, color='white', linestyle='--', alpha=0.5)
+                ax.axhline(y=0.5, color='green', linestyle=':', alpha=0.5)
+                ax.axhline(y=-0.5, color='red', linestyle=':', alpha=0.5)
+                ax.set_xlabel('Date', fontsize=12)
+                ax.set_ylabel('Correlation Coefficient', fontsize=12)
+                ax.set_title('Rolling Correlation Between Assets', fontsize=14, pad=20)
+                ax.set_ylim(-1, 1)
+                ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
+                ax.xaxis.set_major_locator(mdates.MonthLocator(interval=3))
+                plt.xticks(rotation=45)
+                fig.tight_layout()
+                return fig
+
+            cached_pyplot(figure_key("tab2_correlation", rolling_data[['Date', 'Rolling_Correlation']], chart_height), draw_correlation)
 
         # Rolling volatility plot
         with col2:
             st.markdown(f"### Rolling {rolling_window}-Day Volatility")
-            fig, ax = plt.subplots(figsize=(10, chart_height / 100))
-            ax.plot(rolling_data['Date'], rolling_data['RollingStd_A'], color=COLORS.get("commodity1", "#1f77b4"), linewidth=2, label=group_A_name)
-            ax.plot(rolling_data['Date'], rolling_data['RollingStd_B'], color=COLORS.get("commodity2", "#ff7f0e"), linewidth=2, label=group_B_name)
-            ax.set_xlabel('Date', fontsize=12)
-            ax.set_ylabel('Standard Deviation', fontsize=12)
-            ax.set_title('Volatility Comparison', fontsize=14, pad=20)
-            ax.legend(loc='upper left', frameon=True)
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-            ax.xaxis.set_major_locator(mdates.MonthLocator(interval=3))
-            plt.xticks(rotation=45)
-            fig.tight_layout()
-            st.pyplot(fig)
+            def draw_volatility():
+                fig, ax = plt.subplots(figsize=(10, chart_height / 100))
+                ax.plot(*downsample(rolling_data['Date'], rolling_data['RollingStd_A']), color=COLORS.get("commodity1", "#1f77b4"), linewidth=2, label=group_A_name)
+                ax.plot(*downsample(rolling_data['Date'], rolling_data['RollingStd_B']), color=COLORS.get("commodity2", "#ff7f0e"), linewidth=2, label=group_B_name)
+                ax.set_xlabel('Date', fontsize=12)
+                ax.set_ylabel('Standard Deviation', fontsize=12)
+                ax.set_title('Volatility Comparison', fontsize=14, pad=20)
+                ax.legend(loc='upper left', frameon=True)
+                ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
+                ax.xaxis.set_major_locator(mdates.MonthLocator(interval=3))
+                plt.xticks(rotation=45)
+                fig.tight_layout()
+                return fig
+
+            cached_pyplot(figure_key("tab2_volatility", rolling_data[['Date', 'RollingStd_A', 'RollingStd_B']], group_A_name, group_B_name, chart_height, COLORS), draw_volatility)
@@ -1,9 +1,18 @@
 import streamlit as st
-import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-
-def render_tab4(merged_data, group_A_name, group_B_name, var_confidence, COLORS):
+from sidebar import apply_matplotlib_theme
+from kde import plot_kde
+from drawdown import TOP_EPISODES, get_drawdown_report
+from downsample import downsample
+from figure_cache import cached_pyplot, figure_key
+from data_engineering import RETURN_COLUMNS, with_derived_columns
+from risk_engine import CONFIDENCE_LEVELS, TRADING_DAYS, get_risk_report, get_rolling_var_es, returns_matrix
+
+def render_tab4(merged_data, group_A_name, group_B_name, var_confidence, COLORS, constituents=()):
+    apply_matplotlib_theme()
+    merged_data = with_derived_columns(merged_data, RETURN_COLUMNS)
     st.markdown('<div class="section-header">⚠️ Risk Analysis</div>', unsafe_allow_html=True)
 
     st.write(merged_data)
@@ -19,18 +28,19 @@ def render_tab4(merged_data, group_A_name, group_B_name, var_confidence, COLORS)
             st.error(f"Missing required column: {col}. Please check your data.")
             return
 
-    # Drop rows where necessary returns are NaN
-    returns_data = merged_data.dropna(subset=[return_col_A, return_col_B, return_col_spread])
+    # Returns of the groups, the spread and every constituent; all risk metrics for every
+    # confidence level come from one pass and are cached, so the slider is a lookup
+    returns_data = returns_matrix(merged_data, group_A_name, group_B_name, constituents)
 
     if returns_data.empty:
         st.error("No valid data for the risk analysis.")
         return
 
-    # Calculate Value at Risk (VaR)
-    var_pct = (100 - var_confidence) / 100
-    var_a = np.percentile(returns_data[return_col_A], var_pct * 100) * 100
-    var_b = np.percentile(returns_data[return_col_B], var_pct * 100) * 100
-    var_spread = np.percentile(returns_data[return_col_spread], var_pct * 100) * 100
+    report = get_risk_report(returns_data)
+    historical_var = report.lookup("historical_var", var_confidence) * 100
+    var_a = historical_var[group_A_name]
+    var_b = historical_var[group_B_name]
+    var_spread = historical_var["Spread"]
 
     # Display Value at Risk (VaR)
     st.markdown("### Value at Risk (VaR)")
@@ -42,37 +52,45 @@ def render_tab4(merged_data, group_A_name, group_B_name, var_confidence, COLORS)
     with col3:
         st.metric(f"Spread VaR ({var_confidence}%)", f"{var_spread:.2f}%", delta_color="inverse")
 
+    with st.expander(f"📐 VaR and Expected Shortfall by method ({var_confidence}% confidence)", expanded=False):
+        st.dataframe(report.table(var_confidence).style.format("{:.2f}%"), use_container_width=True)
+
     # Plot return distributions with VaR
     st.markdown("### Return Distributions with VaR")
     col1, col2, col3 = st.columns(3)
 
     def plot_return_distribution(ax, data, title, color, var_value):
-        sns.histplot(data * 100, kde=True, color=color, bins=50, ax=ax)
+        values = (data * 100).dropna()
+        sns.histplot(values, color=color, bins=50, ax=ax)
+        plot_kde(ax, values, color=color, scale=len(values) * (values.max() - values.min()) / 50, cut=0)
         ax.axvline(var_value, color='red', linestyle='--', linewidth=2, label=f'VaR ({var_confidence}%): {var_value:.2f}%')
         ax.set_xlabel('Daily Return (%)')
         ax.set_ylabel('Frequency')
         ax.set_title(title)
         ax.legend()
 
+    def show_return_distribution(data, title, color, var_value):
+        def draw():
+            fig, ax = plt.subplots(figsize=(8, 4))
+            plot_return_distribution(ax, data, title, color, var_value)
+            return fig
+
+        cached_pyplot(figure_key("tab4_return_distribution", data, title, color, var_value, var_confidence), draw)
+
     with col1:
-        fig, ax = plt.subplots(figsize=(8, 4))
-        plot_return_distribution(ax, returns_data[return_col_A], f'{group_A_name} Returns', COLORS["commodity1"], var_a)
-        st.pyplot(fig)
+        show_return_distribution(returns_data[group_A_name], f'{group_A_name} Returns', COLORS["commodity1"], var_a)
 
     with col2:
-        fig, ax = plt.subplots(figsize=(8, 4))
-        plot_return_distribution(ax, returns_data[return_col_B], f'{group_B_name} Returns', COLORS["commodity2"], var_b)
-        st.pyplot(fig)
+        show_return_distribution(returns_data[group_B_name], f'{group_B_name} Returns', COLORS["commodity2"], var_b)
 
     with col3:
-        fig, ax = plt.subplots(figsize=(8, 4))
-        plot_return_distribution(ax, returns_data[return_col_spread], 'Spread Returns', COLORS["spread"], var_spread)
-        st.pyplot(fig)
+        show_return_distribution(returns_data['Spread'], 'Spread Returns', COLORS["spread"], var_spread)
 
     # Annualized volatility
-    volatility_a = returns_data[return_col_A].std() * np.sqrt(252) * 100
-    volatility_b = returns_data[return_col_B].std() * np.sqrt(252) * 100
-    volatility_spread = returns_data[return_col_spread].std() * np.sqrt(252) * 100
+    volatility = pd.Series(report.volatility * 100, index=report.series)
+    volatility_a = volatility[group_A_name]
+    volatility_b = volatility[group_B_name]
+    volatility_spread = volatility["Spread"]
 
     # Display volatility
     st.markdown("### Volatility (Annualized)")
@@ -84,16 +102,41 @@ def render_tab4(merged_data, group_A_name, group_B_name, var_confidence, COLORS)
     with col3:
         st.metric("Spread Volatility", f"{volatility_spread:.2f}%")
 
-    # Maximum drawdown calculation
-    def calculate_max_drawdown(returns):
-        cumulative = (1 + returns).cumprod()
-        peak = cumulative.expanding(min_periods=1).max()
-        drawdown = (cumulative - peak) / peak
-        return drawdown.min() * 100
-
-    max_dd_a = calculate_max_drawdown(returns_data[return_col_A])
-    max_dd_b = calculate_max_drawdown(returns_data[return_col_B])
-    max_dd_spread = calculate_max_drawdown(returns_data[return_col_spread])
+    # Rolling tail risk: historical VaR / ES over a trailing window, one line per series
+    st.markdown("### Rolling VaR and Expected Shortfall")
+    col1, col2 = st.columns(2)
+    with col1:
+        rolling_window = st.number_input("Window (trading days)", min_value=20, max_value=5 * TRADING_DAYS,
+                                         value=TRADING_DAYS, step=10, key="tab4_rolling_window")
+    with col2:
+        rolling_confidence = st.select_slider("Confidence (%)", options=CONFIDENCE_LEVELS.tolist(),
+                                              value=var_confidence, key="tab4_rolling_confidence")
+
+    if len(returns_data) < rolling_window:
+        st.info(f"Need at least {rolling_window} days of returns for a rolling window (have {len(returns_data)}).")
+    else:
+        rolling_series = [(group_A_name, COLORS["commodity1"]), (group_B_name, COLORS["commodity2"]), ("Spread", COLORS["spread"])]
+
+        def draw_rolling_tail_risk():
+            fig, ax = plt.subplots(figsize=(14, 5))
+            for name, color in rolling_series:
+                tail_risk = get_rolling_var_es(returns_data, name, int(rolling_window), rolling_confidence) * 100
+                ax.plot(*downsample(tail_risk.index, tail_risk["VaR"]), color=color, linewidth=1.5, label=f"{name} VaR")
+                ax.plot(*downsample(tail_risk.index, tail_risk["ES"]), color=color, linewidth=1, linestyle="--", label=f"{name} ES")
+            ax.set_ylabel("Daily Return (%)")
+            ax.set_title(f"Rolling {int(rolling_window)}-day Historical VaR / ES ({rolling_confidence}%)")
+            ax.legend(ncol=3)
+            return fig
+
+        cached_pyplot(figure_key("tab4_rolling_tail_risk", returns_data[[name for name, _ in rolling_series]],
+                                 rolling_series, int(rolling_window), rolling_confidence), draw_rolling_tail_risk)
+
+    # Drawdowns of every series from one vectorized pass over the returns matrix
+    drawdowns = get_drawdown_report(returns_data)
+    max_drawdown = drawdowns.max_drawdown * 100
+    max_dd_a = max_drawdown[group_A_name]
+    max_dd_b = max_drawdown[group_B_name]
+    max_dd_spread = max_drawdown["Spread"]
 
     # Display max drawdown
     st.markdown("### Maximum Drawdown")
@@ -105,3 +148,29 @@ def render_tab4(merged_data, group_A_name, group_B_name, var_confidence, COLORS)
     with col3:
         st.metric("Spread Max Drawdown", f"{max_dd_spread:.2f}%")
 
+    drawdown_window = st.number_input("Rolling max drawdown window (trading days)", min_value=20, max_value=5 * TRADING_DAYS,
+                                      value=TRADING_DAYS, step=10, key="tab4_drawdown_window")
+    drawdown_series = [(group_A_name, COLORS["commodity1"]), (group_B_name, COLORS["commodity2"]), ("Spread", COLORS["spread"])]
+
+    def draw_drawdowns():
+        underwater_curves = drawdowns.underwater_frame() * 100
+        rolling_drawdown = drawdowns.rolling_max_drawdown(int(drawdown_window)) * 100
+        fig, (ax_underwater, ax_rolling) = plt.subplots(2, 1, figsize=(14, 8), sharex=True)
+        for name, color in drawdown_series:
+            ax_underwater.plot(*downsample(underwater_curves.index, underwater_curves[name]), color=color, linewidth=1, label=name)
+            ax_rolling.plot(*downsample(rolling_drawdown.index, rolling_drawdown[name]), color=color, linewidth=1, label=name)
+        ax_underwater.set_ylabel("Drawdown (%)")
+        ax_underwater.set_title("Underwater Curve")
+        ax_underwater.legend()
+        ax_rolling.set_ylabel("Max Drawdown (%)")
+        ax_rolling.set_title(f"Rolling {int(drawdown_window)}-day Max Drawdown")
+        return fig
+
+    cached_pyplot(figure_key("tab4_drawdowns", returns_data[[name for name, _ in drawdown_series]],
+                             drawdown_series, int(drawdown_window)), draw_drawdowns)
+
+    with st.expander(f"📉 Top {TOP_EPISODES} drawdown episodes", expanded=False):
+        episode_series = st.selectbox("Series", drawdowns.series, key="tab4_drawdown_series")
+        episode_table = drawdowns.episodes(episode_series)
+        episode_table["Depth"] = episode_table["Depth"] * 100
+        st.dataframe(episode_table.style.format({"Depth": "{:.2f}%"}), use_container_width=True)
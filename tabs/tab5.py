@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime
+from trading_calendar import get_trading_calendar
 from data_engineering_tab5 import generate_instrument_lists,concatenate_commodity_data_for_unique_instruments,check_instrument_expiry_month_only,check_instrument_expiry_dict,plot_seasonality_chart_tab5
 
 # Month character code mapping
@@ -57,11 +58,8 @@ def render_tab5(merged_data, instruments, meta_A_month_int, list_of_input_instru
 
     # 6. Add year and trading day
     df_filtered['Year'] = df_filtered['Instrument'].str[-2:].astype(int) + 2000
-    df_filtered['TradingDayOfYear'] = (
-        df_filtered.sort_values(['Instrument', 'Year', 'Date'])
-        .groupby(['Instrument', 'Year'])
-        .cumcount() + 1
-    )
+    first_dates = df_filtered.groupby(['Instrument', 'Year'])['Date'].transform('min')
+    df_filtered['TradingDayOfYear'] = get_trading_calendar().offsets(df_filtered['Date'], first_dates) + 1
 
     # DataFrame preview
     with st.expander("📊 Preview Filtered Data"):
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from contracts import ContractArray
 from data_engineering_tab5 import generate_instrument_lists, check_instrument_expiry_month_only, check_month_status,concatenate_commodity_data_for_unique_instruments_mini,plot_spread_seasonality,plot_kde_distribution
 
 # Month character code mapping
@@ -22,7 +23,7 @@ def render_tab6(list_of_input_instruments):
     # 2. Generate unique instruments and root symbols
     instrument_expiry_check = check_instrument_expiry_month_only(list_of_input_instruments)
     _, unique_instruments = generate_instrument_lists(instrument_expiry_check)
-    root_symbols = sorted(set(inst[:-3] for inst in unique_instruments))
+    root_symbols = sorted(set(ContractArray.from_symbols(unique_instruments).roots))
 
     # UI Section: Selection for Root Symbol and Months
     st.markdown("---")
@@ -91,10 +92,14 @@ def render_tab6(list_of_input_instruments):
 
             spread_dfs = []
 
+            # Fetch every base and comparison contract in one concurrent batch
+            df_all = concatenate_commodity_data_for_unique_instruments_mini(base_instr_list + comp_instr_list, max_retries=3, retry_delay=3)
+            data_by_instrument = dict(tuple(df_all.groupby('Instrument'))) if not df_all.empty else {}
+
             # Iterate over instrument pairs from the same year
             for base_instr, comp_instr in zip(base_instr_list, comp_instr_list):
-                df_base = concatenate_commodity_data_for_unique_instruments_mini([base_instr], max_retries=3, retry_delay=3)
-                df_comp = concatenate_commodity_data_for_unique_instruments_mini([comp_instr], max_retries=3, retry_delay=3)
+                df_base = data_by_instrument.get(base_instr)
+                df_comp = data_by_instrument.get(comp_instr)
 
                 # Skip if either is None or empty
                 if df_base is None or df_comp is None or df_base.empty or df_comp.empty:
@@ -0,0 +1,142 @@
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from expiry_calendar import EXPIRY_CALENDAR, FIRST_YEAR, YEARS_AHEAD
+from price_store import STORE_DIR
+
+TRADING_CALENDAR = EXPIRY_CALENDAR
+MONTH_ABBRS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def to_days(values):
+    """Dates (scalar, list, Series or array) as a datetime64[D] array."""
+    if isinstance(values, (pd.Series, pd.Index)):
+        return values.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    return np.atleast_1d(np.asarray(pd.to_datetime(values), dtype="datetime64[D]"))
+
+
+class TradingCalendar:
+    """
+    Dense trading-day lookup for an exchange calendar.
+
+    `cumulative[i]` is the number of sessions on or before calendar day `first_day + i`,
+    so the trading-day offset between any two dates is a difference of two array lookups.
+    Dates outside the precomputed range fall back to weekday counting.
+    """
+
+    def __init__(self, first_day, session_flags, name=TRADING_CALENDAR):
+        self.first_day = np.datetime64(first_day, "D")
+        self.session_flags = np.asarray(session_flags, dtype=bool)
+        self.cumulative = np.cumsum(self.session_flags, dtype=np.int32)
+        self.last_day = self.first_day + np.timedelta64(len(self.session_flags) - 1, "D")
+        self.name = name
+
+    @property
+    def last_year(self):
+        return int(str(self.last_day)[:4])
+
+    @classmethod
+    def build(cls, first_year=FIRST_YEAR, last_year=None, name=TRADING_CALENDAR):
+        import pandas_market_calendars as mcal
+
+        last_year = last_year or datetime.now().year + YEARS_AHEAD
+        first_day = np.datetime64(f"{first_year}-01-01", "D")
+        last_day = np.datetime64(f"{last_year}-12-31", "D")
+        sched = mcal.get_calendar(name).schedule(start_date=str(first_day), end_date=str(last_day))
+        sessions = sched.index.values.astype("datetime64[D]")
+        flags = np.zeros(int((last_day - first_day).astype(int)) + 1, dtype=bool)
+        flags[(sessions - first_day).astype(int)] = True
+        return cls(first_day, flags, name)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, first_day=self.first_day, session_flags=self.session_flags, name=self.name)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as npz:
+            return cls(npz["first_day"], npz["session_flags"], str(npz["name"]))
+
+    def sessions_through(self, dates):
+        """Number of sessions on or before each date (relative to the start of the table)."""
+        days = to_days(dates)
+        index = (days - self.first_day).astype(np.int64)
+        inside = (index >= 0) & (index < len(self.cumulative))
+        result = np.empty(len(days), dtype=np.int64)
+        result[inside] = self.cumulative[index[inside]]
+
+        before = index < 0
+        if before.any():
+            result[before] = -np.busday_count(days[before] + 1, self.first_day)
+        after = index >= len(self.cumulative)
+        if after.any():
+            result[after] = self.cumulative[-1] + np.busday_count(self.last_day + 1, days[after] + 1)
+        return result
+
+    def offsets(self, dates, anchors):
+        """
+        Trading-day offset of each date from its anchor (scalar or per-date array):
+        0 on the first session on or after the anchor. Non-session dates share the
+        offset of the preceding session.
+        """
+        anchor_days = to_days(anchors) - np.timedelta64(1, "D")
+        return self.sessions_through(dates) - self.sessions_through(anchor_days) - 1
+
+    def day_of_year(self, dates):
+        """1-based trading day within each date's calendar year."""
+        days = to_days(dates)
+        year_starts = days.astype("datetime64[Y]").astype("datetime64[D]")
+        return self.offsets(days, year_starts) + 1
+
+    def month_ranges(self):
+        """
+        Typical (median over the table's years) 1-based trading-day-of-year range of each
+        month, {"Jan": (1, 21), ...}, for month labels and month masks on a trading-day axis.
+        """
+        years = np.arange(int(str(self.first_day)[:4]), self.last_year + 1)
+        month_starts = (years[:, None] - 1970) * 12 + np.arange(12)[None, :]
+        month_starts = month_starts.astype("datetime64[M]").astype("datetime64[D]")
+        starts = np.median(self.day_of_year(month_starts.ravel()).reshape(month_starts.shape), axis=0)
+        starts = np.maximum(np.round(starts).astype(int), 1)
+        starts[0] = 1
+        ends = np.append(starts[1:] - 1, self.max_sessions_per_year())
+        return {abbr: (int(start), int(end)) for abbr, start, end in zip(MONTH_ABBRS, starts, ends)}
+
+    def max_sessions_per_year(self):
+        year_ends = np.arange(int(str(self.first_day)[:4]), self.last_year + 1).astype(str)
+        return int(self.day_of_year(np.char.add(year_ends, "-12-31").astype("datetime64[D]")).max())
+
+
+_calendars = {}
+_calendars_lock = threading.Lock()
+
+
+def get_trading_calendar(name=TRADING_CALENDAR):
+    """Process-wide TradingCalendar, loaded from the store directory or built once and persisted."""
+    path = os.path.join(STORE_DIR, f"trading_calendar_{name}.npz")
+    with _calendars_lock:
+        calendar = _calendars.get(name)
+        if calendar is None:
+            if os.path.exists(path):
+                try:
+                    calendar = TradingCalendar.load(path)
+                    if calendar.last_year < datetime.now().year + 1:
+                        calendar = None  # built too long ago, rebuild with a fresh horizon
+                except Exception as e:
+                    print(f"Error loading trading calendar: {e}")
+                    calendar = None
+            if calendar is None:
+                calendar = TradingCalendar.build(name=name)
+                try:
+                    calendar.save(path)
+                except Exception as e:
+                    print(f"Error saving trading calendar: {e}")
+            _calendars[name] = calendar
+        return calendar